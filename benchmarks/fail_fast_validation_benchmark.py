@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+Validation of a form with a 500-row list field where the first field is
+invalid: collecting all errors compared to "validate(values, fail_fast=True)".
+
+    python benchmarks/fail_fast_validation_benchmark.py
+"""
+
+from __future__ import print_function
+
+import timeit
+
+from pycerberus.validators import IntegerValidator
+
+from grumpyforms.api import Form
+from grumpyforms.fields import ListField, TextField
+
+
+class OrderForm(Form):
+    children = (
+        ListField('items', children=(
+            TextField('quantity', validator=IntegerValidator()),
+            TextField('title'),
+            TextField('price', validator=IntegerValidator()),
+        )),
+    )
+
+
+def main(nr_rows=500, repetitions=20):
+    items = [{'quantity': str(i), 'title': 'item %d' % i, 'price': '10'} for i in range(nr_rows)]
+    items[0]['quantity'] = 'invalid'
+    values = {'items': items}
+    form = OrderForm()
+    results = {}
+    for label, fail_fast in (('all errors', False), ('fail fast', True)):
+        assert form.validate(values, fail_fast=fail_fast).contains_errors()
+        timer = lambda: form.validate(values, fail_fast=fail_fast)
+        duration = min(timeit.repeat(timer, number=repetitions, repeat=3)) / repetitions
+        results[label] = duration
+        print('%-10s %10.2f ms' % (label, duration * 1000))
+    print('speedup    %10.2fx' % (results['all errors'] / results['fail fast']))
+
+
+if __name__ == '__main__':
+    main()
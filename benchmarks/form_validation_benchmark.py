@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+"Form.validate()" throughput for a form with 30 fields: building the
+validation schema for every call (previous implementation) compared to the
+cached schema.
+
+    python benchmarks/form_validation_benchmark.py
+
+The cached schema is about 1.3-1.5x faster (CPython 3.11, pycerberus 0.7.1).
+"""
+
+from __future__ import print_function
+
+import timeit
+
+from pycerberus.schema import SchemaValidator
+from pycerberus.validators import IntegerValidator, StringValidator
+
+from grumpyforms.api import Form
+from grumpyforms.fields import TextField
+
+
+class ContactSchema(SchemaValidator):
+    pass
+
+
+class ThirtyFieldsForm(Form):
+    validator = ContactSchema()
+    children = [TextField('text%d' % i, validator=StringValidator()) for i in range(15)] + \
+        [TextField('number%d' % i, validator=IntegerValidator()) for i in range(15)]
+
+
+class UncachedForm(ThirtyFieldsForm):
+    # schema lookup as implemented before the schema was cached
+    def _cached_validation_schema(self):
+        return self.validation_schema()
+
+
+def main(repetitions=2000):
+    values = dict(('text%d' % i, 'value %d' % i) for i in range(15))
+    values.update(('number%d' % i, str(i)) for i in range(15))
+    results = {}
+    for label, form_class in (('uncached', UncachedForm), ('cached', ThirtyFieldsForm)):
+        form = form_class()
+        duration = min(timeit.repeat(lambda: form.validate(values), number=repetitions, repeat=3))
+        results[label] = repetitions / duration
+        print('%-9s %10.1f validations/s' % (label, results[label]))
+    print('speedup   %10.2fx' % (results['cached'] / results['uncached']))
+
+
+if __name__ == '__main__':
+    main()
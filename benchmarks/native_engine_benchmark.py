@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+Compare rendering a form with 50 fields using the Jinja2 templates and the
+"native" template engine.
+
+    python benchmarks/native_engine_benchmark.py
+"""
+
+from __future__ import print_function
+
+import timeit
+
+from grumpyforms.api import Form
+from grumpyforms.fields import Checkbox, SelectField, TextArea, TextField
+
+
+def build_form(template_engine, nr_fields=50):
+    children = []
+    for i in range(nr_fields):
+        name = 'field%d' % i
+        if i % 10 == 0:
+            child = SelectField(name, options=((1, 'one'), (2, 'two')))
+        elif i % 10 == 1:
+            child = Checkbox(name)
+        elif i % 10 == 2:
+            child = TextArea(name)
+        else:
+            child = TextField(name, id=name, label=name.title())
+        child.template_engine = template_engine
+        children.append(child)
+    return Form(children=children, template_engine=template_engine)
+
+
+def main(repetitions=200):
+    results = {}
+    for template_engine in ('jinja2', 'native'):
+        form = build_form(template_engine)
+        form.display()
+        duration = min(timeit.repeat(form.display, number=repetitions, repeat=3))
+        results[template_engine] = duration / repetitions
+        print('%-8s %8.3f ms per form' % (template_engine, results[template_engine] * 1000))
+    print('speedup  %8.2fx' % (results['jinja2'] / results['native']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+Render a form for many "requests" with a thread pool: building a new form per
+request compared to sharing a single form with "display_for(context)".
+
+    python benchmarks/threaded_rendering_benchmark.py
+"""
+
+from __future__ import print_function
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from grumpyforms.api import Form
+from grumpyforms.fields import ListField, TextField
+
+
+class OrderForm(Form):
+    children = [TextField('field%d' % i) for i in range(20)] + [
+        ListField('items', children=(TextField('title'), TextField('price'))),
+    ]
+
+
+def request_values(nr):
+    values = dict(('field%d' % i, 'value %d' % nr) for i in range(20))
+    values['items'] = [{'title': 'item %d' % i, 'price': str(i)} for i in range(5)]
+    return values
+
+
+def render_new_form(values):
+    form = OrderForm(template_engine='native')
+    form.set_context(form.validate(values))
+    return form.display()
+
+
+shared_form = OrderForm(template_engine='native')
+
+def render_shared_form(values):
+    return shared_form.display_for(shared_form.validate(values))
+
+
+def main(nr_requests=2000):
+    requests = [request_values(nr) for nr in range(nr_requests)]
+    for workers in (1, 4, 8):
+        for label, render in (('new form', render_new_form), ('shared form', render_shared_form)):
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                start = time.time()
+                for _ in executor.map(render, requests):
+                    pass
+                duration = time.time() - start
+            print('%d threads  %-12s %8.1f requests/s' % (workers, label, nr_requests / duration))
+
+
+if __name__ == '__main__':
+    main()
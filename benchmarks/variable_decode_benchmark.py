@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+"variable_decode()" with regular and adversarial inputs of increasing size:
+the current single-pass implementation compared to the previous one (which
+is quadratic for deeply nested lists).
+
+    python benchmarks/variable_decode_benchmark.py
+"""
+
+from __future__ import print_function
+
+import timeit
+
+import six
+
+from grumpyforms.variabledecode import _sort_key, variable_decode
+
+
+def legacy_variable_decode(d, dict_char='.', list_char='-'):
+    # implementation before the single-pass rewrite
+    result = {}
+    dicts_to_sort = set()
+    known_lengths = {}
+    for key, value in six.iteritems(d):
+        keys = key.split(dict_char)
+        new_keys = []
+        was_repetition_count = False
+        for key in keys:
+            if key.endswith('--repetitions'):
+                key = key[:-len('--repetitions')]
+                new_keys.append(key)
+                known_lengths[tuple(new_keys)] = int(value)
+                was_repetition_count = True
+                break
+            elif list_char in key:
+                maybe_key, index = key.split(list_char, 1)
+                if not index.isdigit():
+                    new_keys.append(key)
+                else:
+                    key = maybe_key
+                    new_keys.append(key)
+                    dicts_to_sort.add(tuple(new_keys))
+                    new_keys.append(int(index))
+            else:
+                new_keys.append(key)
+        if was_repetition_count:
+            continue
+
+        place = result
+        for i in range(len(new_keys) - 1):
+            try:
+                if not isinstance(place[new_keys[i]], dict):
+                    place[new_keys[i]] = {None: place[new_keys[i]]}
+                place = place[new_keys[i]]
+            except KeyError:
+                place[new_keys[i]] = {}
+                place = place[new_keys[i]]
+        if new_keys[-1] in place:
+            if isinstance(place[new_keys[-1]], dict):
+                place[new_keys[-1]][None] = value
+            elif isinstance(place[new_keys[-1]], list):
+                if isinstance(value, list):
+                    place[new_keys[-1]].extend(value)
+                else:
+                    place[new_keys[-1]].append(value)
+            else:
+                if isinstance(value, list):
+                    place[new_keys[-1]] = [place[new_keys[-1]]]
+                    place[new_keys[-1]].extend(value)
+                else:
+                    place[new_keys[-1]] = [place[new_keys[-1]], value]
+        else:
+            place[new_keys[-1]] = value
+
+    to_sort_list = sorted(dicts_to_sort, key=len, reverse=True)
+    for key in to_sort_list:
+        to_sort = result
+        source = None
+        last_key = None
+        for sub_key in key:
+            source = to_sort
+            last_key = sub_key
+            to_sort = to_sort[sub_key]
+        if None in to_sort:
+            none_values = [(0, x) for x in to_sort.pop(None)]
+            none_values.extend(six.iteritems(to_sort))
+            to_sort = none_values
+        else:
+            to_sort = six.iteritems(to_sort)
+        to_sort = [x[1] for x in sorted(to_sort, key=_sort_key)]
+        if key in known_lengths:
+            if len(to_sort) < known_lengths[key]:
+                to_sort.extend([''] * (known_lengths[key] - len(to_sort)))
+        source[last_key] = to_sort
+
+    return result
+
+
+def list_field_rows(size):
+    # "items-N.field" as submitted by a ListField with many rows
+    fields = ('title', 'price', 'quantity', 'comment')
+    rows = size // len(fields)
+    return dict(('items-%d.%s' % (i, field), 'value') for i in range(rows) for field in fields)
+
+def deep_dict_chain(size):
+    return {'.'.join(['a'] * size): 'x'}
+
+def deep_list_chain(size):
+    return {'.'.join(['a-0'] * size): 'x'}
+
+def sparse_indices(size):
+    return dict(('a-%d' % (i * 10**9), 'x') for i in range(size))
+
+def many_siblings(size):
+    return dict(('a.b%d' % i, 'x') for i in range(size))
+
+inputs = (
+    ('list field rows', list_field_rows),
+    ('deep a.a.a', deep_dict_chain),
+    ('deep a-0.a-0', deep_list_chain),
+    ('sparse indices', sparse_indices),
+    ('many siblings', many_siblings),
+)
+
+
+def main(sizes=(1000, 2000, 4000, 8000)):
+    for label, build_input in inputs:
+        for size in sizes:
+            parameters = build_input(size)
+            durations = []
+            for decode in (legacy_variable_decode, variable_decode):
+                assert decode(parameters) is not None
+                duration = min(timeit.repeat(lambda: decode(parameters), number=3, repeat=3)) / 3
+                durations.append(duration)
+            legacy, current = durations
+            print('%-16s %6d  legacy %9.2f ms  current %8.2f ms  (%5.1fx)' % (
+                label, size, legacy * 1000, current * 1000, legacy / current))
+
+
+if __name__ == '__main__':
+    main()
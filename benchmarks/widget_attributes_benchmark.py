@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+Per-field rendering overhead of "Widget.widget_attributes()" with cached
+attribute names compared to the previous "dir()"-based implementation.
+
+    python benchmarks/widget_attributes_benchmark.py
+"""
+
+from __future__ import print_function
+
+import timeit
+
+from grumpyforms.fields import TextField
+
+
+class DirBasedTextField(TextField):
+    # attribute lookup as implemented before attribute names were cached
+    def widget_attributes(self):
+        attributes = dict()
+        for key in dir(self):
+            if key.startswith('_'):
+                continue
+            value = getattr(self, key)
+            if callable(value):
+                continue
+            attributes[key] = value
+        return attributes
+
+    def _attribute_names(self):
+        return set(self.widget_attributes())
+
+
+def main(repetitions=5000):
+    results = {}
+    for label, field_class in (('dir()', DirBasedTextField), ('cached', TextField)):
+        field = field_class('name', id='name', template_engine='native')
+        for operation in ('widget_attributes', 'display', 'copy'):
+            timer = getattr(field, operation)
+            duration = min(timeit.repeat(timer, number=repetitions, repeat=3)) / repetitions
+            results[(label, operation)] = duration
+            print('%-7s %-18s %8.2f us' % (label, operation, duration * 10**6))
+    for operation in ('widget_attributes', 'display', 'copy'):
+        speedup = results[('dir()', operation)] / results[('cached', operation)]
+        print('speedup %-18s %8.2fx' % (operation, speedup))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,25 +4,182 @@
 
 from __future__ import absolute_import
 
+from collections import OrderedDict
 import os
 import copy
+import re
+import threading
 
 from pycerberus.errors import InvalidDataError
 from pycerberus.lib.form_data import FieldData, FormData
 from pycerberus.schema import SchemaValidator
+import six
 
 from grumpywidgets.api import Widget
+from grumpywidgets.template_cache import register_template_path
 from grumpywidgets.widgets import Label
-from .variabledecode import variable_decode
+from .batch_validation import validate_many
+from .variabledecode import (parse_urlencoded, variable_decode,
+    variable_decode_pairs, variable_decode_urlencoded)
+# registers native templates for all widgets in grumpyforms
+from . import native_templates
+if not six.PY2:
+    from .async_validation import (is_async_validator, validate_form_async,
+        validate_input_async, AsyncResultValidator)
 
 
-__all__ = ['decode_parameters', 'InputWidget', 'Form']
+__all__ = ['decode_parameters', 'schema_field_validator', 'schema_signature',
+           'shared_schema', 'InputWidget', 'Form']
 
-def decode_parameters(parameters):
-    return variable_decode(parameters)
+def decode_parameters(parameters, **limits):
+    """Decode the flat request parameters into a nested structure (see
+    "grumpyforms.variabledecode.variable_decode()").
+
+    "parameters" can be a dict, an iterable of (key, value) pairs (repeated
+    keys are collected in a list) or a raw urlencoded request body
+    (bytes/memoryview).
+
+    "limits" (e.g. "max_keys=1000") are passed to "variable_decode()"; a
+    DecodeLimitError is raised if the parameters exceed any of them."""
+    if isinstance(parameters, (bytes, bytearray, memoryview)):
+        return variable_decode_urlencoded(parameters, **limits)
+    elif hasattr(parameters, 'items'):
+        return variable_decode(parameters, **limits)
+    return variable_decode_pairs(parameters, **limits)
+
+def _parameter_pairs(parameters):
+    if isinstance(parameters, (bytes, bytearray, memoryview)):
+        return parse_urlencoded(parameters)
+    elif hasattr(parameters, 'items'):
+        return six.iteritems(parameters)
+    return parameters
+
+def _tree_signature(children, widgets):
+    """Return a signature (hashable) for the names of all "children" and
+    their descendants. All widgets are appended to "widgets" which must be
+    kept alive as long as the signature is used (it contains "id()"s)."""
+    signature = []
+    for child in children:
+        widgets.append(child)
+        nested_children = getattr(child, 'children', None) or ()
+        signature.append((id(child), getattr(child, 'name', None),
+                          _tree_signature(nested_children, widgets)))
+    return tuple(signature)
+
+def _parameter_name_pattern(children):
+    """Return a regular expression (source) which matches the full names
+    (relative to the parent) of all named "children" and their descendants
+    (e.g. "items-3.price" and "items--repetitions" for list fields)."""
+    alternatives = []
+    for child in children:
+        name = getattr(child, 'name', None)
+        nested_children = getattr(child, 'children', None) or ()
+        is_list_field = hasattr(child, 'child_rows')
+        if isinstance(child, Form) and (name is None):
+            # unnamed sub forms do not add a level to the full name
+            alternatives.append(_parameter_name_pattern(nested_children))
+            continue
+        elif name is None:
+            continue
+        name_pattern = re.escape(name)
+        if is_list_field:
+            nested_pattern = _parameter_name_pattern(nested_children)
+            rows = r'-\d+\.(?:%s)|' % nested_pattern if nested_pattern else ''
+            alternatives.append(r'%s(?:%s--repetitions)' % (name_pattern, rows))
+        elif isinstance(child, Form):
+            nested_pattern = _parameter_name_pattern(nested_children)
+            if nested_pattern:
+                alternatives.append(r'%s\.(?:%s)' % (name_pattern, nested_pattern))
+        else:
+            alternatives.append(name_pattern)
+    return '|'.join([alternative for alternative in alternatives if alternative])
+
+def schema_signature(validator, children):
+    """Return a signature (hashable) for a schema built from "validator" and
+    the validators of all "children" as well as a list of these validators.
+
+    The signature uses "id()" so the validators must be kept alive as long as
+    the signature is used (e.g. stored in the same cache entry)."""
+    validators = [validator]
+    signature = [id(validator)]
+    for child in children:
+        child_validator = getattr(child, 'validator', None)
+        validators.append(child_validator)
+        signature.extend((child.name, id(child_validator)))
+    return tuple(signature), validators
+
+# (widget class, schema signature) -> (validators, schema) for the most
+# recently used schemas, see "shared_schema()"
+_shared_schemas = OrderedDict()
+_shared_schemas_lock = threading.Lock()
+max_shared_schemas = 100
+
+def shared_schema(widget_class, signature, validators, build_schema):
+    """Return the schema for "signature" (see "schema_signature()") which is
+    shared by all widgets of "widget_class" with the same validators (e.g. all
+    instances of a form class). "build_schema()" is only called if there is no
+    such schema.
+
+    Sharing schemas means that validating a new form instance does not
+    create any new validators (which contain reference cycles)."""
+    key = (widget_class, signature)
+    with _shared_schemas_lock:
+        cached = _shared_schemas.pop(key, None)
+        if cached is None:
+            cached = (validators, build_schema())
+        _shared_schemas[key] = cached
+        while len(_shared_schemas) > max_shared_schemas:
+            _shared_schemas.popitem(last=False)
+    return cached[1]
+
+def _check_async_support():
+    if six.PY2:
+        raise RuntimeError('async validation requires Python 3')
+
+def schema_field_validator(validator):
+    """Return the validator which is added to a validation schema for a field
+    with "validator" (asynchronous validators are wrapped so
+    ".validate_async()" can use the same schema)."""
+    if (not six.PY2) and is_async_validator(validator):
+        return AsyncResultValidator(validator)
+    return validator
+
+# "items-3" -> row 3 of the list field "items" (see "ListField.path()")
+_row_name = re.compile(r'^(.+)-(\d+)$')
+
+def _child_with_name(children, name):
+    for child in children:
+        child_name = getattr(child, 'name', None)
+        if child_name == name:
+            return child
+        elif (child_name is None) and isinstance(child, Form):
+            # unnamed sub forms do not add a level to the full name
+            nested_child = _child_with_name(child.children, name)
+            if nested_child is not None:
+                return nested_child
+    return None
+
+def _validate_children_fail_fast(children, values):
+    """Validate "values" (dict) with the validators of all children (in order)
+    and stop at the first invalid child.
+
+    Return the validated values and "None" or "None" and a tuple
+    (child name, child context) for the first invalid child."""
+    validated_values = {}
+    for child in children:
+        child_validator = getattr(child, 'validator', None)
+        if (child.name is None) or (child_validator is None):
+            # same children as used in the validation schema
+            continue
+        child_context = child.validate(values.get(child.name), fail_fast=True)
+        if child_context.contains_errors():
+            return None, (child.name, child_context)
+        validated_values[child.name] = child_context.value
+    return validated_values, None
 
 this_dir = os.path.dirname(__file__)
 grumpyforms_template_dir = os.path.join(this_dir, 'templates')
+register_template_path(grumpyforms_template_dir)
 
 class InputWidget(Widget):
     validator = None
@@ -31,14 +188,15 @@ class InputWidget(Widget):
     attrs = None
 
     _template_path = grumpyforms_template_dir
-    template_engine = 'jinja2'
 
     def __init__(self, name=None, **kwargs):
         if name is not None:
             kwargs['name'] = name
         super(InputWidget, self).__init__(**kwargs)
 
-    def validate(self, value):
+    def validate(self, value, fail_fast=False):
+        # "fail_fast" is only relevant for containers (single fields have
+        # only one validator)
         c = FieldData(initial_value=value)
         if self.validator is not None:
             try:
@@ -49,6 +207,14 @@ class InputWidget(Widget):
             c.value = value
         return c
 
+    def validate_async(self, value):
+        """Return an awaitable which validates "value" (Python 3.6+) and
+        supports asynchronous validators (see "grumpyforms.async_validation").
+        Widgets with a synchronous validator are validated with
+        ".validate()"."""
+        _check_async_support()
+        return validate_input_async(self, value)
+
     def _display_value(self, value):
         value = super(InputWidget, self)._display_value(value)
         if value is None:
@@ -57,10 +223,10 @@ class InputWidget(Widget):
             return value
         return self.validator.revert_conversion(value)
 
-    def display(self, value=None, **kwargs):
+    def _display_variables(self, value=None, **kwargs):
         if (value is None) and (self.context.value is None):
             value = self.context.initial_value
-        return super(InputWidget, self).display(value=value, **kwargs)
+        return super(InputWidget, self)._display_variables(value=value, **kwargs)
 
     def label_widget(self):
         if self.label is None:
@@ -111,20 +277,53 @@ class Form(InputWidget):
     def __init__(self, *args, **kwargs):
         super(Form, self).__init__(*args, **kwargs)
         self.children = self._initialize_children()
+        # shared with all bound copies of this form (see ".bind()")
+        self._schema_cache = {}
 
     def _initialize_children(self):
         instance_children = []
         for child in self.children:
             cloned_child = child.copy()
-            # TODO: use a weakref to avoid memory hogging
             cloned_child.parent = self
             instance_children.append(cloned_child)
         return instance_children
 
-    def validate(self, values):
+    def validate(self, values, fail_fast=False):
+        """Validate "values" and return the context (FormData).
+
+        With "fail_fast=True" the validation stops at the first invalid field
+        which is much cheaper if you only need to know whether the values are
+        valid. The context contains only that error and the values of the
+        fields up to the invalid one. Forms with a form validator (which
+        needs all values) are always validated completely."""
+        if fail_fast and isinstance(values, dict) and (self.validator is None):
+            return self._validate_fail_fast(values)
+        return self._validate_with_schema(values, self._cached_validation_schema())
+
+    def _validate_fail_fast(self, values):
+        validated_values, error = _validate_children_fail_fast(self.children, values)
+        if error is None:
+            context = self.new_context(unvalidated=values)
+            context.update(validated_values)
+            return context
+        child_name, child_context = error
+        # Only the fields before the invalid one get their initial value,
+        # building the context for all fields (e.g. list fields with many
+        # rows) would be as expensive as the complete validation.
+        processed_values = {}
+        for child in self.children:
+            if child.name == child_name:
+                break
+            elif child.name in values:
+                processed_values[child.name] = values[child.name]
+        context = self.new_context(unvalidated=processed_values)
+        # the child context already contains its initial value
+        context.children[child_name] = child_context
+        return context
+
+    def _validate_with_schema(self, values, schema):
         context = self.new_context(unvalidated=values)
         try:
-            schema = self.validation_schema()
             validated_values = schema.process(values)
         except InvalidDataError as e:
             context.update(errors=e.unpack_errors())
@@ -132,6 +331,46 @@ class Form(InputWidget):
             context.update(validated_values)
         return context
 
+    def validate_async(self, values):
+        """Return an awaitable which validates "values" (Python 3.6+).
+
+        Asynchronous validators of all children (e.g. checking uniqueness
+        with a database query, also for fields in list field rows) run
+        concurrently via "asyncio.gather()". The result is the same FormData
+        as returned by ".validate()" (using the same cached schema)."""
+        _check_async_support()
+        return validate_form_async(self, values)
+
+    def validate_many(self, values_iterable, executor=None, chunk_size=100,
+                      compact=False, max_pending_chunks=16):
+        """Validate many records (e.g. rows of a CSV import) with this form
+        and return an iterator of validation contexts (in the same order).
+
+        The input is consumed lazily and the validation schema is built only
+        once. With "compact=True" the iterator yields "ValidationResult"
+        tuples (value and error messages only) instead.
+
+        If "executor" (a "concurrent.futures.Executor") is given, the input is
+        validated in chunks of "chunk_size" records by the executor (at most
+        "max_pending_chunks" chunks at a time). For a ProcessPoolExecutor use
+        a blueprint (".blueprint()" is pickled as reference to its class) and
+        "compact=True" as validators/errors are usually not picklable."""
+        return validate_many(self, values_iterable, executor=executor,
+            chunk_size=chunk_size, compact=compact,
+            max_pending_chunks=max_pending_chunks)
+
+    def _cached_validation_schema(self):
+        """Return the validation schema for this form which is built only once
+        (and rebuilt only if the validator or any child/child validator was
+        replaced)."""
+        signature, validators = schema_signature(self.validator, self.children)
+        cached = self._schema_cache.get('schema')
+        if (cached is not None) and (cached[0] == signature):
+            return cached[2]
+        schema = shared_schema(self.__class__, signature, validators, self.validation_schema)
+        self._schema_cache['schema'] = (signature, validators, schema)
+        return schema
+
     def validation_schema(self):
         if self.validator is None:
             schema = SchemaValidator()
@@ -143,10 +382,10 @@ class Form(InputWidget):
             child_validator = getattr(child, 'validator', None)
             if child_validator is None:
                 continue
-            schema.add(child.name, child_validator)
+            schema.add(child.name, schema_field_validator(child_validator))
         return schema
 
-    def display(self, value=None, child_data=None, **kwargs):
+    def _display_variables(self, value=None, child_data=None, **kwargs):
         if value is not None:
             self.context.update(value)
         if child_data is not None:
@@ -155,7 +394,7 @@ class Form(InputWidget):
                 child_meta = child.meta or {}
                 child_meta.update(data)
                 child.set(meta=child_meta)
-        return super(Form, self).display(value=None, **kwargs)
+        return super(Form, self)._display_variables(value=None, **kwargs)
 
     def children_(self):
         for child in self.children:
@@ -164,6 +403,9 @@ class Form(InputWidget):
                 context = child.new_context()
             else:
                 context = self.context.children[child_name]
+            if self._bind_children:
+                yield child.bind(context, parent=self)
+                continue
             child.set_context(context)
             yield child
 
@@ -174,6 +416,69 @@ class Form(InputWidget):
                 return child
         return None
 
+    def widget_by_path(self, path):
+        """Return the (shared) child widget for "path" (as returned by
+        "full_name()", e.g. "items-3.price" for a field in a ListField row).
+
+        Raises a ValueError if there is no such widget."""
+        widget = self
+        is_row = False
+        for name in path.split('.'):
+            is_list_field = hasattr(widget, 'child_rows')
+            if is_list_field and not is_row:
+                # children of a list field must be addressed with a row number
+                raise ValueError('unknown field %s' % path)
+            children = getattr(widget, 'children', None) or ()
+            child = _child_with_name(children, name)
+            is_row = False
+            if child is None:
+                match = _row_name.match(name)
+                if match is not None:
+                    child = _child_with_name(children, match.group(1))
+                    is_row = True
+                if (child is None) or (is_row and not hasattr(child, 'child_rows')):
+                    raise ValueError('unknown field %s' % path)
+            widget = child
+        if is_row:
+            raise ValueError('%s is not a field (but a list field row)' % path)
+        return widget
+
+    def validate_field(self, path, value):
+        """Validate a single field (e.g. "items-3.price" for a field in a
+        ListField row) without validating the whole form and return its
+        context (FieldData).
+
+        Form validators (which need all values) are not executed."""
+        return self.widget_by_path(path).validate(value)
+
+    def decode(self, parameters, **limits):
+        """Decode the flat request parameters (like "decode_parameters()")
+        but only keys which match the full name of a child of this form
+        (e.g. "items-3.price" for a field in a ListField row). All other keys
+        are skipped before decoding so junk parameters cost (almost) no
+        memory.
+
+        "limits" (e.g. "max_keys=1000") only apply to the accepted keys."""
+        is_known_name = self._cached_parameter_names().match
+        pairs = _parameter_pairs(parameters)
+        return variable_decode_pairs(
+            (item for item in pairs if is_known_name(item[0])), **limits)
+
+    def _cached_parameter_names(self):
+        """Return the compiled regular expression which matches all valid
+        parameter names for this form (rebuilt only if any child in the
+        widget tree was added, removed or renamed)."""
+        widgets = []
+        signature = _tree_signature(self.children, widgets)
+        cached = self._schema_cache.get('parameter_names')
+        if (cached is not None) and (cached[0] == signature):
+            return cached[2]
+        pattern = _parameter_name_pattern(self.children)
+        # an empty pattern must not match any name
+        regex = re.compile(r'(?:%s)\Z' % pattern if pattern else r'(?!)')
+        self._schema_cache['parameter_names'] = (signature, widgets, regex)
+        return regex
+
     def path(self):
         if self.parent is None:
             return ()
@@ -0,0 +1,172 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+asyncio validation (Python 3.6+ only), see "InputWidget.validate_async()" and
+"Form.validate_async()".
+
+A validator is asynchronous if it provides a "process_async(value)" method or
+if its "process()" method is a coroutine function. Both must return an
+awaitable which resolves to the converted value (or raises an
+InvalidDataError).
+"""
+
+import asyncio
+import inspect
+import threading
+
+from pycerberus.api import Validator
+from pycerberus.errors import InvalidDataError
+from pycerberus.lib.form_data import FieldData
+
+
+__all__ = [
+    'AsyncResultValidator',
+    'is_async_validator',
+    'process_async',
+    'validate_form_async',
+    'validate_input_async',
+]
+
+def is_async_validator(validator):
+    if validator is None:
+        return False
+    if hasattr(validator, 'process_async'):
+        return True
+    return asyncio.iscoroutinefunction(getattr(validator, 'process', None))
+
+
+async def process_async(validator, value):
+    process_async_ = getattr(validator, 'process_async', None)
+    if process_async_ is not None:
+        return await process_async_(value)
+    result = validator.process(value)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _outcome(validator, value):
+    try:
+        return await process_async(validator, value)
+    except InvalidDataError as e:
+        return e
+
+
+class _ValidationOutcome(Validator):
+    """Replaces an asynchronous validator in the validation schema with its
+    (already computed) result so the schema produces exactly the same
+    FormData as for synchronous validators."""
+    def __init__(self, outcome):
+        self.outcome = outcome
+        super(_ValidationOutcome, self).__init__()
+
+    def is_empty(self, value, context):
+        # the original validator already checked for empty values
+        return False
+
+    def convert(self, value, context):
+        if isinstance(self.outcome, InvalidDataError):
+            raise self.outcome
+        return self.outcome
+
+
+# outcomes of all asynchronous validators for the current validation
+# ((id(validator), id(value)) -> outcome), see "_validate_with_outcomes()"
+_current = threading.local()
+
+class AsyncResultValidator(object):
+    """Wraps an asynchronous validator in a (cached) validation schema.
+
+    While ".validate_async()" runs the synchronous validation, the wrapper
+    returns the outcome which was computed before for the same value.
+    Otherwise (".validate()") the wrapped validator is used as is."""
+    def __init__(self, validator):
+        self.validator = validator
+
+    def __getattr__(self, name):
+        return getattr(self.validator, name)
+
+    def process(self, value, context=None):
+        outcomes = getattr(_current, 'outcomes', None) or {}
+        key = (id(self.validator), id(value))
+        if key in outcomes:
+            return _ValidationOutcome(outcomes[key]).process(value, context)
+        result = self.validator.process(value, context)
+        if inspect.isawaitable(result):
+            if inspect.iscoroutine(result):
+                result.close()
+            raise TypeError('%r is asynchronous, use ".validate_async()"' % self.validator)
+        return result
+
+
+def _pending_validations(children, values, pending):
+    """Collect (validator, value) for all asynchronous validators of
+    "children" (including all ListField rows) in "pending"."""
+    if not isinstance(values, dict):
+        return pending
+    for child in children:
+        if child.name is None:
+            continue
+        validator = getattr(child, 'validator', None)
+        if hasattr(child, 'child_rows'):
+            rows = values.get(child.name)
+            if isinstance(rows, (list, tuple)):
+                for row_values in rows:
+                    _pending_validations(child.children, row_values, pending)
+        elif is_async_validator(validator):
+            if child.name in values:
+                value = values[child.name]
+            else:
+                # same value as used by the SchemaValidator
+                value = validator.empty_value({})
+            pending.append((validator, value))
+    return pending
+
+
+async def _validate_with_outcomes(pending, validate, values):
+    outcomes = await asyncio.gather(*[
+        _outcome(validator, value) for validator, value in pending
+    ])
+    results = {}
+    for (validator, value), outcome in zip(pending, outcomes):
+        results[(id(validator), id(value))] = outcome
+    # the synchronous validation does not yield to the event loop so the
+    # outcomes can not leak into other validations (even in other threads)
+    previous = getattr(_current, 'outcomes', None)
+    _current.outcomes = results
+    try:
+        return validate(values)
+    finally:
+        _current.outcomes = previous
+
+
+async def validate_input_async(widget, value):
+    if hasattr(widget, 'child_rows'):
+        # list field: asynchronous validators of the fields in each row
+        pending = []
+        if isinstance(value, (list, tuple)):
+            for row_values in value:
+                _pending_validations(widget.children, row_values, pending)
+        if not pending:
+            return widget.validate(value)
+        return await _validate_with_outcomes(pending, widget.validate, value)
+
+    validator = widget.validator
+    if not is_async_validator(validator):
+        return widget.validate(value)
+    context = FieldData(initial_value=value)
+    try:
+        context.value = await process_async(validator, value)
+    except InvalidDataError as e:
+        context.errors = (e, )
+    return context
+
+
+async def validate_form_async(form, values):
+    # All asynchronous validators (also in list field rows) run concurrently,
+    # the results are merged by the regular (cached) validation schema.
+    pending = _pending_validations(form.children, values, [])
+    if not pending:
+        return form.validate(values)
+    return await _validate_with_outcomes(pending, form.validate, values)
@@ -0,0 +1,80 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+Validation of many records with the same form, see "Form.validate_many()".
+"""
+
+from __future__ import absolute_import
+
+from collections import deque, namedtuple
+from itertools import islice
+
+import six
+
+
+__all__ = ['compact_errors', 'validate_many', 'ValidationResult']
+
+# picklable (compact) variant of a validation context: "errors" contains only
+# the error messages (with the same structure as "context.errors")
+ValidationResult = namedtuple('ValidationResult', ('value', 'errors'))
+
+
+def compact_errors(errors):
+    if errors is None:
+        return None
+    if isinstance(errors, dict):
+        return dict((key, compact_errors(value)) for key, value in errors.items())
+    if isinstance(errors, (list, tuple)):
+        return tuple(compact_errors(error) for error in errors)
+    return six.text_type(errors.details().msg())
+
+
+def _compact_result(context):
+    errors = context.errors if context.contains_errors() else None
+    return ValidationResult(value=context.value, errors=compact_errors(errors))
+
+
+def _validate_chunk(form, values_chunk, compact):
+    # module-level function so it can be used with a ProcessPoolExecutor
+    results = []
+    for values in values_chunk:
+        context = form.validate(values)
+        results.append(_compact_result(context) if compact else context)
+    return results
+
+
+def _chunks(iterable, chunk_size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_many(form, values_iterable, executor=None, chunk_size=100,
+                  compact=False, max_pending_chunks=16):
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive (got %r)' % (chunk_size, ))
+    return _validate_many(form, values_iterable, executor, chunk_size,
+                          compact, max_pending_chunks)
+
+def _validate_many(form, values_iterable, executor, chunk_size, compact, max_pending_chunks):
+    if executor is None:
+        for values in values_iterable:
+            context = form.validate(values)
+            yield _compact_result(context) if compact else context
+        return
+
+    # Only a limited number of chunks is submitted to the executor at any time
+    # so huge (or endless) inputs are consumed lazily.
+    pending = deque()
+    for chunk in _chunks(values_iterable, chunk_size):
+        pending.append(executor.submit(_validate_chunk, form, chunk, compact))
+        if len(pending) >= max_pending_chunks:
+            for result in pending.popleft().result():
+                yield result
+    while pending:
+        for result in pending.popleft().result():
+            yield result
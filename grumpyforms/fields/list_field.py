@@ -8,7 +8,8 @@ from pycerberus.schema import SchemaValidator
 from pycerberus.validators import ForEach
 from pythonic_testcase import *
 
-from grumpyforms.api import InputWidget
+from grumpyforms.api import (_validate_children_fail_fast, schema_field_validator,
+    schema_signature, shared_schema, InputWidget)
 
 
 __all__ = ['ListField']
@@ -16,16 +17,19 @@ __all__ = ['ListField']
 class ListField(InputWidget):
     template_name = 'list_field'
     children = ()
+    # position of the current row for bound list fields (see ".child_rows()")
+    _row_number = None
 
     def __init__(self, *args, **kwargs):
         super(ListField, self).__init__(*args, **kwargs)
         self.children = self._initialize_children()
+        # shared with all bound copies of this list field (see ".bind()")
+        self._validator_cache = {}
 
     def _initialize_children(self):
         instance_children = []
         for child in self.children:
             cloned_child = child.copy()
-            # TODO: use a weakref to avoid memory hogging
             cloned_child.parent = self
             instance_children.append(cloned_child)
         return instance_children
@@ -47,20 +51,50 @@ class ListField(InputWidget):
         self.context = context
 
     def child_rows(self):
+        if self._bind_children:
+            for row in self._bound_child_rows():
+                yield row
+            return
         self.context.count = 0
         for container_context in self.context.items:
             row = []
             self.context.count += 1
             for child in self.children:
-                if child.name not in container_context.children:
-                    context = child.new_context()
-                else:
-                    context = container_context.children[child.name]
+                context = self._child_context(child, container_context)
                 child.set_context(context)
                 row.append(child)
             yield tuple(row)
 
-    def validate(self, values):
+    def _bound_child_rows(self):
+        # Each row gets its own bound list field as parent (which knows the
+        # row number) so neither the context nor any widget is modified.
+        for row_number, container_context in enumerate(self.context.items, 1):
+            row_parent = self.bind(self.context)
+            row_parent._row_number = row_number
+            row = []
+            for child in self.children:
+                context = self._child_context(child, container_context)
+                row.append(child.bind(context, parent=row_parent))
+            yield tuple(row)
+
+    def _child_context(self, child, container_context):
+        if child.name not in container_context.children:
+            return child.new_context()
+        return container_context.children[child.name]
+
+    def validate(self, values, fail_fast=False):
+        """Validate all rows and return the context (RepeatingFieldData).
+
+        With "fail_fast=True" the validation stops at the first invalid field
+        (in the first invalid row). The context then contains only the rows up
+        to the invalid one."""
+        if fail_fast and (values is None):
+            # no parameters for this list field: zero rows (as the validation
+            # schema of a form does for missing list fields)
+            values = ()
+        is_list = isinstance(values, (list, tuple))
+        if fail_fast and is_list and all(isinstance(row, dict) for row in values):
+            return self._validate_fail_fast(values)
         context = self.new_context(unvalidated=values)
         try:
             validated_values = self.validator.process(values)
@@ -71,8 +105,37 @@ class ListField(InputWidget):
             context.update(validated_values)
         return context
 
+    def _validate_fail_fast(self, values):
+        validated_rows = []
+        for row_values in values:
+            validated_values, error = _validate_children_fail_fast(self.children, row_values)
+            if error is not None:
+                # context only for the rows up to the invalid one (see
+                # "Form.validate()")
+                context = self.new_context(unvalidated=values[:len(validated_rows) + 1])
+                child_name, child_context = error
+                row_context = context.items[-1]
+                row_context.children[child_name] = child_context
+                return context
+            validated_rows.append(validated_values)
+        context = self.new_context(unvalidated=values)
+        context.update(tuple(validated_rows))
+        return context
+
     @property
     def validator(self):
+        # The validator is used for validation as well as for every rendering
+        # so it is built only once (unless the children changed).
+        signature, validators = schema_signature(None, self.children)
+        cached = self._validator_cache.get('validator')
+        if (cached is not None) and (cached[0] == signature):
+            return cached[2]
+        validator = shared_schema(self.__class__, signature, validators,
+            self._build_validator)
+        self._validator_cache['validator'] = (signature, validators, validator)
+        return validator
+
+    def _build_validator(self):
         schema = SchemaValidator()
         for child in self.children:
             if child.name is None:
@@ -80,7 +143,7 @@ class ListField(InputWidget):
             child_validator = getattr(child, 'validator', None)
             if child_validator is None:
                 continue
-            schema.add(child.name, child_validator)
+            schema.add(child.name, schema_field_validator(child_validator))
         return ForEach(schema)
 
     def css_classes_for_container(self):
@@ -94,10 +157,10 @@ class ListField(InputWidget):
             classes = classes.union(set(self.css_classes))
         return tuple(classes)
 
-    def display(self, value=None, **kwargs):
+    def _display_variables(self, value=None, **kwargs):
         if value is not None:
             self.context.update(value)
-        return super(ListField, self).display(value=None, **kwargs)
+        return super(ListField, self)._display_variables(value=None, **kwargs)
 
     def path(self):
         parts = []
@@ -105,7 +168,9 @@ class ListField(InputWidget):
             parts.extend(self.parent.path())
         if self.name is not None:
             widget_name = self.name
-            if hasattr(self.context, 'count'):
+            if self._row_number is not None:
+                widget_name = '%s-%s' % (self.name, self._row_number)
+            elif hasattr(self.context, 'count'):
                 widget_name = '%s-%s' % (self.name, self.context.count)
             parts.append(widget_name)
         return tuple(parts)
@@ -43,3 +43,33 @@ class ListFieldValidationTest(PythonicTestCase):
         assert_equals(['number'], list(error.keys()))
         assert_not_none(error['number'])
 
+
+    def test_builds_validator_only_once(self):
+        validator = self.list_field.validator
+        assert_true(self.list_field.validator is validator)
+        assert_true(self.list_field.bind().validator is validator)
+        self.list_field.display([{'number': 42}])
+        assert_true(self.list_field.validator is validator)
+
+    def test_rebuilds_validator_when_children_change(self):
+        validator = self.list_field.validator
+        self.list_field.children[0].validator = IntegerValidator()
+        new_validator = self.list_field.validator
+        assert_false(new_validator is validator)
+
+        self.list_field.children = tuple(self.list_field.children) + (TextField('name'), )
+        assert_false(self.list_field.validator is new_validator)
+
+    def test_can_stop_validation_at_first_error(self):
+        input_ = [{'number': '42'}, {'number': 'invalid'}, {'number': 'invalid'}]
+        result = self.list_field.validate(input_, fail_fast=True)
+
+        assert_true(result.contains_errors())
+        assert_equals(1, result.error_count)
+        assert_true(result.items[1].children['number'].contains_errors())
+        assert_length(2, result.items)
+
+    def test_returns_values_with_fail_fast(self):
+        result = self.list_field.validate([{'number': '42'}, {}], fail_fast=True)
+        assert_false(result.contains_errors())
+        assert_equals(({'number': 42}, {'number': None}), result.value)
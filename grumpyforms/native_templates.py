@@ -0,0 +1,199 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+Native templates (see "grumpywidgets.native_support") for all widgets in
+grumpyforms. Each function mirrors the Jinja2 template with the same name
+(including its whitespace) so both engines produce identical markup.
+"""
+
+from __future__ import absolute_import
+
+from markupsafe import escape
+import six
+
+from grumpywidgets.native_support import native_attr, register_native_template
+
+
+__all__ = [
+    'render_checkbox',
+    'render_form',
+    'render_list_field',
+    'render_radiobutton',
+    'render_select_field',
+    'render_submit_button',
+    'render_textarea',
+    'render_textlike_input_field',
+    'stream_form',
+    'stream_list_field',
+]
+
+text = six.text_type
+
+def _full_name(v):
+    return v['self_'].full_name(v.get('name'))
+
+def _extra_attrs(attrs):
+    if not attrs:
+        return u''
+    return u''.join([u' %s="%s" ' % (key, value) for key, value in attrs.items()])
+
+def _child_container(child, h, with_container_attrs):
+    parts = [u'<div ']
+    container_id = child.id_for_container()
+    if container_id:
+        parts.append(u'id="%s" ' % (container_id, ))
+    parts.append(u'class="%s"' % u' '.join(child.css_classes_for_container()))
+    if with_container_attrs:
+        container_attrs = child.attributes_for_container()
+        if container_attrs:
+            for name, value in container_attrs.items():
+                parts.append(u' %s="%s"' % (name, escape(value)))
+    parts.append(u'>')
+    parts.append(text(h.render_label(child)))
+    yield u''.join(parts)
+    for chunk in child.display_stream():
+        yield chunk
+    parts = []
+    if child.context.contains_errors():
+        for rendered_msg in h.error_messages(child.context):
+            parts.append(u'<span class="validationerror-message">%s</span>' % (rendered_msg, ))
+    parts.append(u'</div>')
+    yield u''.join(parts)
+
+
+def render_checkbox(v):
+    option_value = v.get('option_value')
+    return u''.join((
+        u'<input type="checkbox"',
+        native_attr('id', v.get('id')),
+        native_attr('name', v.get('name')),
+        u' value="%s"' % (option_value, ) if (option_value != None) else u'',
+        u' checked="checked"' if (v.get('value') == True) else u'',
+        u' disabled="disabled"' if (v.get('disabled') == True) else u'',
+        native_attr('class', v.get('css_classes')),
+        u' />',
+    ))
+
+
+def stream_form(v):
+    h = v['h']
+    yield u''.join((
+        u'<form',
+        native_attr('id', v.get('id')),
+        native_attr('name', v.get('name')),
+        native_attr('class', v.get('css_classes')),
+        u' action="%s"' % (v.get('url'), ),
+        u' method="%s"' % (v.get('method'), ),
+        native_attr('enctype', v.get('enctype')),
+        u' accept-charset="%s"' % (v.get('charset'), ),
+        u'>',
+    ))
+    for child in v['self_'].children_():
+        for chunk in _child_container(child, h, with_container_attrs=True):
+            yield chunk
+    yield u'</form>'
+
+def render_form(v):
+    return u''.join(stream_form(v))
+
+
+def stream_list_field(v):
+    h = v['h']
+    self_ = v['self_']
+    yield u''.join((
+        u'<ul',
+        native_attr('id', v.get('id')),
+        u'\n    class="%s">' % (h.render_class(self_.css_classes_for_container()), ),
+    ))
+    for children_ in self_.child_rows():
+        yield u'<li>'
+        for child in children_:
+            for chunk in _child_container(child, h, with_container_attrs=False):
+                yield chunk
+        yield u'</li>'
+    yield u'</ul>'
+
+def render_list_field(v):
+    return u''.join(stream_list_field(v))
+
+
+def render_radiobutton(v):
+    option_value = v.get('option_value')
+    return u''.join((
+        u'<input type="radio"',
+        native_attr('id', v.get('id')),
+        native_attr('name', _full_name(v)),
+        u' value="%s"' % (option_value, ) if (option_value != None) else u'',
+        u' checked="checked"' if (v.get('value') == True) else u'',
+        native_attr('class', v.get('css_classes')),
+        _extra_attrs(v.get('attrs')),
+        u'/>',
+    ))
+
+
+def render_select_field(v):
+    value = v.get('value')
+    parts = [
+        u'<select',
+        native_attr('id', v.get('id')),
+        native_attr('name', _full_name(v)),
+        native_attr('class', v.get('css_classes')),
+        _extra_attrs(v.get('attrs')),
+        u'>\n',
+    ]
+    for option_value, option_display in v.get('options'):
+        selected = u' selected="selected"' if (value == option_value) else u''
+        parts.append(u'<option value="%s"%s>%s</option>\n' % (option_value, selected, option_display))
+    parts.append(u'</select>')
+    return u''.join(parts)
+
+
+def render_submit_button(v):
+    return u''.join((
+        u'<input type="submit"',
+        native_attr('id', v.get('id')),
+        native_attr('name', _full_name(v)),
+        native_attr('value', v.get('value')),
+        native_attr('class', v.get('css_classes')),
+        _extra_attrs(v.get('attrs')),
+        u'/>',
+    ))
+
+
+def render_textarea(v):
+    value = v.get('value')
+    return u''.join((
+        u'<textarea',
+        native_attr('id', v.get('id')),
+        native_attr('name', _full_name(v)),
+        native_attr('cols', v.get('cols')),
+        native_attr('rows', v.get('rows')),
+        native_attr('class', v.get('css_classes')),
+        _extra_attrs(v.get('attrs')),
+        u'>',
+        text(value) if value else u'',
+        u'</textarea>',
+    ))
+
+
+def render_textlike_input_field(v):
+    return u''.join((
+        u'<input type="%s"' % (v.get('type'), ),
+        native_attr('id', v.get('id')),
+        native_attr('name', _full_name(v)),
+        native_attr('value', v.get('value')),
+        native_attr('class', v.get('css_classes')),
+        _extra_attrs(v.get('attrs')),
+        u'/>',
+    ))
+
+
+register_native_template('checkbox', render_checkbox)
+register_native_template('form', render_form, stream_form)
+register_native_template('list_field', render_list_field, stream_list_field)
+register_native_template('radiobutton', render_radiobutton)
+register_native_template('select_field', render_select_field)
+register_native_template('submit_button', render_submit_button)
+register_native_template('textarea', render_textarea)
+register_native_template('textlike_input_field', render_textlike_input_field)
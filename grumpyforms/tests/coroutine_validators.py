@@ -0,0 +1,17 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+Validators implemented as coroutines for the asyncio validation tests
+(Python 3.6+ only: this module is not a test module so it is never imported
+by the test runner on Python 2).
+"""
+
+from pycerberus.validators import IntegerValidator
+
+
+__all__ = ['CoroutineValidator']
+
+class CoroutineValidator(IntegerValidator):
+    async def process(self, value, context=None):
+        return 42
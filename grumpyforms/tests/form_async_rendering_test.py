@@ -0,0 +1,64 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from unittest import skipIf
+
+from pycerberus.validators import IntegerValidator
+from pythonic_testcase import *
+import six
+
+from grumpyforms.api import Form
+from grumpyforms.fields import ListField, TextField
+from grumpywidgets.testhelpers import flatten_stream, template_widget, use_event_loop
+
+
+@skipIf(six.PY2, 'asyncio rendering requires Python 3')
+class FormAsyncRenderingTest(PythonicTestCase):
+    template_engine = 'jinja2'
+
+    def setUp(self):
+        class NumbersForm(Form):
+            children = (
+                TextField('number', validator=IntegerValidator(required=False)),
+                ListField('items', children=(TextField('name'), )),
+            )
+        self.form = template_widget(NumbersForm, self.template_engine)
+        self.loop = use_event_loop(self)
+
+    def test_renders_same_markup_as_synchronous_display(self):
+        values = {'number': '42', 'items': [{'name': 'foo'}, {'name': 'bar'}]}
+        html = flatten_stream(self.form.display(values))
+        assert_equals(html, self.loop.run_until_complete(self.form.display_async(values)))
+
+    def test_renders_children_asynchronously(self):
+        rendered = []
+        class TracingTextField(TextField):
+            def display_stream_async(self, *args, **kwargs):
+                rendered.append(self.name)
+                return super(TracingTextField, self).display_stream_async(*args, **kwargs)
+        form = template_widget(Form, self.template_engine,
+            dict(children=(TracingTextField('foo'), TracingTextField('bar'))))
+
+        self.loop.run_until_complete(form.display_async())
+        assert_equals(['foo', 'bar'], rendered)
+
+    def test_renders_children_with_custom_display_method(self):
+        class FancyTextField(TextField):
+            def display(self, value=None, **kwargs):
+                html = super(FancyTextField, self).display(value, **kwargs)
+                return u'<span class="fancy">%s</span>' % flatten_stream(html)
+        form = template_widget(Form, self.template_engine,
+            dict(children=(FancyTextField('foo'), )))
+        html = self.loop.run_until_complete(form.display_async())
+        assert_contains(u'<span class="fancy">', html)
+
+
+@skipIf(six.PY2, 'asyncio rendering requires Python 3')
+class NativeFormAsyncRenderingTest(FormAsyncRenderingTest):
+    template_engine = 'native'
+
+    def test_renders_children_asynchronously(self):
+        # native templates are synchronous functions and render their children
+        # synchronously as well
+        pass
@@ -0,0 +1,131 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+import time
+from unittest import skipIf
+
+from pycerberus.errors import InvalidDataError
+from pycerberus.validators import IntegerValidator
+from pythonic_testcase import *
+import six
+
+from grumpyforms.api import Form
+from grumpyforms.fields import ListField, TextField
+from grumpywidgets.testhelpers import use_event_loop
+if not six.PY2:
+    import asyncio
+
+    from grumpyforms.tests.coroutine_validators import CoroutineValidator
+
+
+class DelayedIntegerValidator(IntegerValidator):
+    """Asynchronous validator (e.g. a database query) which needs "delay"
+    seconds to validate a value."""
+    def __init__(self, delay=0.2, *args, **kwargs):
+        self.delay = delay
+        super(DelayedIntegerValidator, self).__init__(*args, **kwargs)
+
+    def process_async(self, value):
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        def resolve():
+            try:
+                future.set_result(self.process(value))
+            except InvalidDataError as e:
+                future.set_exception(e)
+        loop.call_later(self.delay, resolve)
+        return future
+
+
+@skipIf(six.PY2, 'asyncio validation requires Python 3')
+class FormAsyncValidationTest(PythonicTestCase):
+    def setUp(self):
+        class OrderForm(Form):
+            children = (
+                TextField('name'),
+                TextField('amount', validator=DelayedIntegerValidator()),
+                TextField('price', validator=DelayedIntegerValidator()),
+                TextField('quantity', validator=DelayedIntegerValidator()),
+            )
+        self.form = OrderForm()
+        self.loop = use_event_loop(self)
+
+    def test_can_validate_form_with_async_validators(self):
+        values = {'name': 'foo', 'amount': '1', 'price': '2', 'quantity': '3'}
+        context = self.loop.run_until_complete(self.form.validate_async(values))
+        assert_false(context.contains_errors())
+        assert_equals({'name': 'foo', 'amount': 1, 'price': 2, 'quantity': 3}, context.value)
+        assert_equals('1', context.children['amount'].initial_value)
+
+    def test_runs_async_validators_concurrently(self):
+        values = {'name': 'foo', 'amount': '1', 'price': '2', 'quantity': '3'}
+        start = time.time()
+        self.loop.run_until_complete(self.form.validate_async(values))
+        # three validators with 0.2 seconds delay each
+        assert_true(time.time() - start < 0.5)
+
+    def test_returns_same_errors_as_synchronous_validation(self):
+        values = {'name': 'foo', 'amount': 'invalid', 'price': '2', 'quantity': ''}
+        context = self.loop.run_until_complete(self.form.validate_async(values))
+        sync_context = self.form.validate(values)
+
+        assert_true(context.contains_errors())
+        assert_equals(set(['amount', 'quantity']), set(context.errors))
+        assert_equals(set(sync_context.errors), set(context.errors))
+        assert_equals('invalid_number', context.children['amount'].errors[0].details().key())
+        assert_equals('empty', context.children['quantity'].errors[0].details().key())
+
+    def test_uses_synchronous_validation_without_async_validators(self):
+        form = Form(children=(TextField('number', validator=IntegerValidator()), ))
+        context = self.loop.run_until_complete(form.validate_async({'number': '42'}))
+        assert_equals({'number': 42}, context.value)
+
+    def test_can_validate_single_field_asynchronously(self):
+        field = TextField('amount', validator=DelayedIntegerValidator(delay=0))
+        context = self.loop.run_until_complete(field.validate_async('42'))
+        assert_equals(42, context.value)
+
+        context = self.loop.run_until_complete(field.validate_async('invalid'))
+        assert_true(context.contains_errors())
+        assert_equals(42, self.loop.run_until_complete(TextField(validator=IntegerValidator()).validate_async('42')).value)
+
+    def test_awaits_async_validators_in_list_field_rows(self):
+        class InvoiceForm(Form):
+            children = (
+                TextField('name'),
+                ListField('items', children=(
+                    TextField('description'),
+                    TextField('amount', validator=DelayedIntegerValidator()),
+                )),
+            )
+        form = InvoiceForm()
+        values = {'name': 'foo', 'items': [
+            {'description': 'a', 'amount': '1'},
+            {'description': 'b', 'amount': '2'},
+        ]}
+        start = time.time()
+        context = self.loop.run_until_complete(form.validate_async(values))
+        assert_true(time.time() - start < 0.35)
+        assert_false(context.contains_errors())
+        expected_items = ({'description': 'a', 'amount': 1}, {'description': 'b', 'amount': 2})
+        assert_equals({'name': 'foo', 'items': expected_items}, context.value)
+
+        values['items'][1]['amount'] = 'invalid'
+        context = self.loop.run_until_complete(form.validate_async(values))
+        assert_true(context.contains_errors())
+        items_context = context.children['items']
+        assert_false(items_context.items[0].contains_errors())
+        assert_equals('invalid_number',
+            items_context.items[1].children['amount'].errors[0].details().key())
+
+    def test_uses_cached_validation_schema(self):
+        schema = self.form._cached_validation_schema()
+        values = {'name': 'foo', 'amount': '1', 'price': '2', 'quantity': '3'}
+        self.loop.run_until_complete(self.form.validate_async(values))
+        assert_true(schema is self.form._cached_validation_schema())
+
+    def test_synchronous_validation_rejects_coroutine_validators(self):
+        form = Form(children=(TextField('number', validator=CoroutineValidator()), ))
+        assert_raises(TypeError, lambda: form.validate({'number': '1'}))
+        assert_equals({'number': 42}, self.loop.run_until_complete(form.validate_async({'number': '1'})).value)
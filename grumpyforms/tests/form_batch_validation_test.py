@@ -0,0 +1,88 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+import pickle
+from unittest import skipIf
+
+from pycerberus.validators import IntegerValidator
+from pythonic_testcase import *
+import six
+
+from grumpyforms.api import Form
+from grumpyforms.batch_validation import ValidationResult
+from grumpyforms.fields import TextField
+if not six.PY2:
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class ImportForm(Form):
+    children = (
+        TextField('name'),
+        TextField('amount', validator=IntegerValidator()),
+    )
+
+
+def import_rows(nr_rows):
+    for i in range(nr_rows):
+        amount = 'invalid' if (i % 10 == 3) else str(i)
+        yield {'name': 'row %d' % i, 'amount': amount}
+
+
+class FormBatchValidationTest(PythonicTestCase):
+    def expected_results(self, nr_rows):
+        form = ImportForm()
+        return [form.validate(values) for values in import_rows(nr_rows)]
+
+    def assert_same_contexts(self, expected, contexts):
+        assert_equals([c.value for c in expected], [c.value for c in contexts])
+        assert_equals([c.contains_errors() for c in expected],
+                      [c.contains_errors() for c in contexts])
+
+    def test_can_validate_many_records(self):
+        contexts = list(ImportForm().validate_many(import_rows(25)))
+        assert_length(25, contexts)
+        assert_equals({'name': 'row 2', 'amount': 2}, contexts[2].value)
+        assert_true(contexts[3].contains_errors())
+        self.assert_same_contexts(self.expected_results(25), contexts)
+
+    def test_consumes_input_lazily(self):
+        consumed = []
+        def rows():
+            for values in import_rows(1000):
+                consumed.append(values)
+                yield values
+        results = ImportForm().validate_many(rows())
+        assert_equals([], consumed)
+        next(results)
+        assert_length(1, consumed)
+
+    def test_can_return_compact_results(self):
+        results = list(ImportForm().validate_many(import_rows(4), compact=True))
+        assert_equals(ValidationResult({'name': 'row 0', 'amount': 0}, None), results[0])
+        assert_equals({'amount': (u'Please enter a number.', )}, results[3].errors)
+
+    def test_rejects_invalid_chunk_size(self):
+        form = ImportForm()
+        assert_raises(ValueError, lambda: form.validate_many([], chunk_size=0))
+
+    @skipIf(six.PY2, 'concurrent.futures requires Python 3')
+    def test_can_validate_chunks_with_executor(self):
+        form = ImportForm.blueprint()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            contexts = list(form.validate_many(import_rows(250), executor=executor,
+                chunk_size=7, max_pending_chunks=3))
+        self.assert_same_contexts(self.expected_results(250), contexts)
+
+    @skipIf(six.PY2, 'concurrent.futures requires Python 3')
+    def test_can_validate_chunks_in_other_processes(self):
+        form = ImportForm.blueprint()
+        expected = list(form.validate_many(import_rows(50), compact=True))
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(form.validate_many(import_rows(50), executor=executor,
+                chunk_size=10, compact=True))
+        assert_equals(expected, results)
+
+    def test_blueprints_are_pickled_as_class_reference(self):
+        blueprint = ImportForm.blueprint()
+        assert_true(pickle.loads(pickle.dumps(blueprint)) is blueprint)
@@ -0,0 +1,98 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from pycerberus.validators import IntegerValidator
+from pythonic_testcase import *
+
+from grumpyforms.api import Form
+from grumpyforms.fields import ListField, TextField
+from grumpywidgets.api import invalidate_class_attribute_names
+
+
+class ContactForm(Form):
+    children = (
+        TextField('name', id='name'),
+        TextField('age', validator=IntegerValidator()),
+        ListField('items', children=(TextField('title'), )),
+    )
+
+
+class FormBlueprintTest(PythonicTestCase):
+    def test_blueprint_is_built_only_once_per_class(self):
+        blueprint = ContactForm.blueprint()
+        assert_true(ContactForm.blueprint() is blueprint)
+        assert_false(Form.blueprint() is blueprint)
+
+    def test_blueprint_is_frozen_recursively(self):
+        blueprint = ContactForm.blueprint()
+        assert_raises(AttributeError, lambda: setattr(blueprint, 'id', 'foo'))
+        name_field = blueprint.children[0]
+        assert_raises(AttributeError, lambda: setattr(name_field, 'name', 'foo'))
+        title_field = blueprint.children[2].children[0]
+        assert_raises(AttributeError, lambda: setattr(title_field, 'name', 'foo'))
+
+    def test_can_discard_blueprint_after_modifying_the_class(self):
+        class SimpleForm(Form):
+            children = (TextField('name'), )
+        blueprint = SimpleForm.blueprint()
+        SimpleForm.url = '/foo'
+        invalidate_class_attribute_names()
+        new_blueprint = SimpleForm.blueprint()
+        assert_false(new_blueprint is blueprint)
+        assert_equals('/foo', new_blueprint.url)
+
+    def test_bound_form_shares_children(self):
+        blueprint = ContactForm.blueprint()
+        form = blueprint.bind(url='/contact')
+
+        assert_true(form.children is blueprint.children)
+        assert_equals('/contact', form.url)
+        assert_equals('', blueprint.url)
+        assert_false(form.context is blueprint.context)
+        form.id = 'contact'
+        assert_none(blueprint.id)
+
+    def test_bind_rejects_unknown_attributes(self):
+        blueprint = ContactForm.blueprint()
+        e = assert_raises(TypeError, lambda: blueprint.bind(invalid=True))
+        assert_equals("bind() got an unexpected keyword argument 'invalid'", e.args[0])
+
+    def test_bound_form_renders_like_regular_form(self):
+        values = {'name': 'Foo', 'age': '42', 'items': [{'title': 'bar'}]}
+        form = ContactForm()
+        form.set_context(form.validate(values))
+        bound_form = ContactForm.blueprint().bind()
+        bound_form.set_context(bound_form.validate(values))
+
+        assert_equals(form.display(), bound_form.display())
+        assert_equals(form.display(), u''.join(bound_form.display_stream()))
+
+    def test_rendering_does_not_modify_blueprint_children(self):
+        blueprint = ContactForm.blueprint()
+        first = blueprint.bind()
+        first.set_context(first.validate({'name': 'Foo', 'age': 'invalid'}))
+        second = blueprint.bind()
+
+        assert_contains(u'value="Foo"', first.display())
+        assert_not_contains(u'Foo', second.display())
+        name_field = blueprint.children[0]
+        assert_none(name_field.context.value)
+
+    def test_rendering_blueprint_does_not_modify_its_context(self):
+        blueprint = ContactForm.blueprint()
+        assert_contains(u'value="secret"', blueprint.display({'name': 'secret'}))
+        assert_contains(u'value="secret"',
+            u''.join(blueprint.display_stream({'name': 'secret'})))
+
+        assert_equals(blueprint.new_context().value, blueprint.context.value)
+        assert_none(blueprint.children[0].context.value)
+        assert_not_contains(u'secret', blueprint.display())
+        assert_raises(AttributeError, lambda: blueprint.set_context(blueprint.new_context()))
+
+    def test_bound_children_use_bound_parent(self):
+        form = ContactForm.blueprint().bind()
+        children = tuple(form.children_())
+        assert_true(children[0].parent is form)
+        assert_equals('name', children[0].full_name())
+        assert_equals(u'<input type="text" id="name" name="name"/>', children[0].display())
@@ -2,10 +2,14 @@
 # The source code contained in this file is licensed under the MIT license.
 # See LICENSE.txt in the main project directory, for more information.
 
+import gc
+
+from pycerberus.api import Validator
 from pythonic_testcase import *
+import six
 
-from grumpyforms.api import Form
-from grumpyforms.fields import TextField
+from grumpyforms.api import Form, InputWidget
+from grumpyforms.fields import ListField, TextField
 
 
 class FormChildrenInitializationTest(PythonicTestCase):
@@ -24,6 +28,11 @@ class FormChildrenInitializationTest(PythonicTestCase):
         self.form.children[0].name = 'foo'
         assert_equals('number', second.children[0].name)
 
+    def test_shares_immutable_validators_between_form_instances(self):
+        second = self.ChildForm()
+        assert_false(second.children[0] is self.form.children[0])
+        assert_true(second.children[0].validator is self.form.children[0].validator)
+
     def test_creates_new_child_instances_on_copy(self):
         second = self.form.copy()
 
@@ -31,3 +40,50 @@ class FormChildrenInitializationTest(PythonicTestCase):
         assert_equals('number', second.children[0].name)
 
 
+
+
+class FormParentReferencesTest(PythonicTestCase):
+    class OrderForm(Form):
+        template_engine = 'jinja2'
+        children = (
+            TextField('customer'),
+            ListField('items', children=(TextField('title'), )),
+        )
+
+    def test_children_only_keep_weak_reference_to_parent(self):
+        form = self.OrderForm()
+        child = form.children[0]
+        assert_equals(form, child.parent)
+
+        del form
+        gc.collect()
+        assert_none(child.parent)
+
+    def _validate_and_render(self, values):
+        form = self.OrderForm()
+        form.set_context(form.validate(values))
+        form.display()
+        u''.join(form.display_stream())
+        bound_form = self.OrderForm.blueprint().bind()
+        bound_form.display_for(bound_form.validate(values))
+
+    def test_rendered_form_does_not_create_reference_cycles(self):
+        values = {'customer': 'Foo', 'items': [{'title': 'bar'}, {'title': 'baz'}]}
+        # compiles templates, builds the shared validation schemas
+        self._validate_and_render(values)
+        gc.collect()
+        gc.set_debug(gc.DEBUG_SAVEALL)
+        try:
+            self._validate_and_render(values)
+            gc.collect()
+            garbage = list(gc.garbage)
+        finally:
+            gc.set_debug(0)
+            del gc.garbage[:]
+        if six.PY2:
+            # Python 2's OrderedDict (used by pycerberus' FormData) always
+            # contains reference cycles
+            garbage = [item for item in garbage if isinstance(item, (InputWidget, Validator))]
+        # no widgets, validators (schemas), contexts, ... which need the
+        # cyclic GC
+        assert_equals([], garbage)
@@ -0,0 +1,88 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from pythonic_testcase import *
+
+from grumpyforms.api import decode_parameters, Form
+from grumpyforms.fields import ListField, TextField
+from grumpyforms.variabledecode import DecodeLimitError
+
+
+class OrderForm(Form):
+    children = (
+        TextField('customer'),
+        TextField('first-name'),
+        ListField('items', children=(
+            TextField('name'),
+            TextField('price'),
+        )),
+        Form('address', children=(TextField('city'), )),
+    )
+
+
+class FormDecodeTest(PythonicTestCase):
+    def test_decodes_only_known_parameters(self):
+        parameters = {
+            'customer': 'foo',
+            'first-name': 'bar',
+            'items-0.name': 'apple',
+            'items-1.price': '3',
+            'items--repetitions': '2',
+            'address.city': 'Berlin',
+            # unknown keys
+            'junk': 'x',
+            'items-0.unknown': 'x',
+            'items.name': 'x',
+            'items-a.name': 'x',
+            'address.city.x': 'x',
+            'address': 'x',
+            'customerx': 'x',
+        }
+        expected = {
+            'customer': 'foo',
+            'first-name': 'bar',
+            'items': [{'name': 'apple'}, {'price': '3'}],
+            'address': {'city': 'Berlin'},
+        }
+        assert_equals(expected, OrderForm().decode(parameters))
+
+    def test_returns_same_result_as_decode_parameters_for_known_parameters(self):
+        parameters = {'customer': 'foo', 'items-1.name': 'a', 'items-0.name': 'b',
+                      'items--repetitions': '3', 'address.city': 'Berlin'}
+        assert_equals(decode_parameters(parameters), OrderForm().decode(parameters))
+
+    def test_can_decode_pairs_and_urlencoded_body(self):
+        form = OrderForm()
+        expected = {'customer': ['foo', 'bar'], 'items': [{'name': 'apple pie'}]}
+        pairs = [('customer', 'foo'), ('junk', 'x'), ('customer', 'bar'), ('items-0.name', 'apple pie')]
+        assert_equals(expected, form.decode(pairs))
+        body = b'customer=foo&junk=x&customer=bar&items-0.name=apple+pie'
+        assert_equals(expected, form.decode(body))
+
+    def test_limits_apply_only_to_known_parameters(self):
+        form = OrderForm()
+        parameters = dict(('junk%d' % i, 'x') for i in range(100))
+        parameters['customer'] = 'foo'
+        assert_equals({'customer': 'foo'}, form.decode(parameters, max_keys=1))
+        parameters['first-name'] = 'bar'
+        assert_raises(DecodeLimitError, lambda: form.decode(parameters, max_keys=1))
+
+    def test_rebuilds_parameter_names_if_children_change(self):
+        form = OrderForm()
+        assert_equals({}, form.decode({'comment': 'x'}))
+        form.children.append(TextField('comment'))
+        assert_equals({'comment': 'x'}, form.decode({'comment': 'x'}))
+
+    def test_rebuilds_parameter_names_if_nested_children_change(self):
+        form = OrderForm()
+        parameters = {'items-0.tax': '7', 'address.zip': '12345'}
+        assert_equals({}, form.decode(parameters))
+        items, address = form.children[2], form.children[3]
+        items.children.append(TextField('tax'))
+        address.children.append(TextField('zip'))
+        assert_equals({'items': [{'tax': '7'}], 'address': {'zip': '12345'}},
+            form.decode(parameters))
+
+    def test_form_without_named_children_decodes_nothing(self):
+        assert_equals({}, Form().decode({'foo': 'bar', '': 'x'}))
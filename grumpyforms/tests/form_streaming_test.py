@@ -0,0 +1,133 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from io import StringIO
+from wsgiref.util import setup_testing_defaults
+from wsgiref.validate import validator
+
+from pycerberus.validators import IntegerValidator
+from pythonic_testcase import *
+import six
+
+from grumpyforms.api import Form
+from grumpyforms.fields import ListField, TextField
+from grumpywidgets.testhelpers import flatten_stream, template_widget
+
+
+class FormStreamingTest(PythonicTestCase):
+    template_engine = 'jinja2'
+
+    def setUp(self):
+        class NumbersForm(Form):
+            children = (
+                TextField('number', validator=IntegerValidator(required=False)),
+                ListField('items', children=(TextField('name'), )),
+            )
+        self.form = template_widget(NumbersForm, self.template_engine)
+
+    def test_streamed_markup_is_the_same_as_displayed_markup(self):
+        values = {'number': '42', 'items': [{'name': 'foo'}, {'name': 'bar'}]}
+        html = flatten_stream(self.form.display(values))
+        chunks = list(self.form.display_stream(values))
+        assert_true(len(chunks) > 1)
+        for chunk in chunks:
+            assert_isinstance(chunk, six.text_type)
+        assert_equals(html, u''.join(chunks))
+
+    def test_streams_list_field_rows(self):
+        list_field = template_widget(ListField, self.template_engine,
+            dict(name='items', children=(TextField('name'), )))
+        values = [{'name': 'row%d' % i} for i in range(10)]
+        chunks = list(list_field.display_stream(values))
+        assert_true(len(chunks) >= 10)
+        assert_equals(flatten_stream(list_field.display(values)), u''.join(chunks))
+
+    def test_renders_nested_children_while_streaming(self):
+        rendered = []
+        engine = self.template_engine
+        class TracingTextField(TextField):
+            template_engine = engine
+            def _display_variables(self, *args, **kwargs):
+                rendered.append(self.context.initial_value)
+                return super(TracingTextField, self)._display_variables(*args, **kwargs)
+        class ItemsForm(Form):
+            template_engine = engine
+            children = (
+                ListField('items', template_engine=engine,
+                          children=(TracingTextField('name'), )),
+            )
+        values = {'items': [{'name': 'row%d' % i} for i in range(50)]}
+        for chunk in ItemsForm().display_stream(values):
+            if 'row0' in chunk:
+                break
+        else:
+            raise AssertionError('row0 not rendered')
+        # the list field was not rendered completely before the first row
+        # was returned
+        assert_true(len(rendered) < 50, message=repr(len(rendered)))
+
+    def test_renders_containers_in_list_field_rows_while_streaming(self):
+        rendered = []
+        engine = self.template_engine
+        class TracingTextField(TextField):
+            template_engine = engine
+            def _display_variables(self, *args, **kwargs):
+                rendered.append(self.name)
+                return super(TracingTextField, self)._display_variables(*args, **kwargs)
+        details_form = Form('details', template_engine=engine,
+            children=[TracingTextField('f%d' % i) for i in range(50)])
+        list_field = ListField('rows', template_engine=engine, children=(details_form, ))
+        for chunk in list_field.display_stream([{'details': {'f0': 'v0'}}]):
+            if 'v0' in chunk:
+                break
+        else:
+            raise AssertionError('v0 not rendered')
+        assert_true(len(rendered) < 50, message=repr(len(rendered)))
+
+    def test_renders_children_with_custom_display_method(self):
+        class FancyTextField(TextField):
+            def display(self, value=None, **kwargs):
+                html = super(FancyTextField, self).display(value, **kwargs)
+                return u'<span class="fancy">%s</span>' % flatten_stream(html)
+        form = template_widget(Form, self.template_engine, dict(children=(
+            FancyTextField('name'),
+            ListField('items', children=(FancyTextField('title'), )),
+        )))
+        values = {'name': 'foo', 'items': [{'title': 'bar'}]}
+        html = flatten_stream(form.display(values))
+        assert_equals(2, html.count(u'<span class="fancy">'), message=html)
+        assert_equals(html, u''.join(form.display_stream(values)))
+
+    def test_can_render_into_writer(self):
+        values = {'number': '42', 'items': [{'name': 'foo'}]}
+        buffer_ = StringIO()
+        self.form.render_into(buffer_, values)
+        assert_equals(flatten_stream(self.form.display(values)), buffer_.getvalue())
+
+    def test_can_use_bytes_stream_as_wsgi_response(self):
+        values = {'number': '42', 'items': [{'name': u'f\xfc\xdf'}]}
+        def application(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/html; charset=utf-8')])
+            return self.form.display_bytes_stream(values)
+        environ = {'QUERY_STRING': ''}
+        setup_testing_defaults(environ)
+        response = validator(application)(environ, lambda status, headers: None)
+        try:
+            body = b''.join(response)
+        finally:
+            response.close()
+        assert_equals(flatten_stream(self.form.display(values)).encode('utf-8'), body)
+
+    def test_checks_display_parameters_before_streaming(self):
+        e = assert_raises(TypeError, lambda: self.form.display_stream(invalid='bar'))
+        assert_equals("display() got an unexpected keyword argument 'invalid'",
+                      e.args[0])
+
+
+class NativeFormStreamingTest(FormStreamingTest):
+    template_engine = 'native'
+
+
+class GenshiFormStreamingTest(FormStreamingTest):
+    template_engine = 'genshi'
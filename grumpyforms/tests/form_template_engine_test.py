@@ -0,0 +1,95 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from io import StringIO
+import shutil
+import tempfile
+
+from pythonic_testcase import *
+import six
+
+from grumpyforms.api import Form, InputWidget
+from grumpyforms.fields import ListField, TextField
+from grumpywidgets.api import Widget
+from grumpywidgets.engines import (get_template_engine,
+    register_template_engine, GenshiEngine)
+from grumpywidgets.testhelpers import assert_same_html, write_template
+
+
+class RecordingGenshiEngine(GenshiEngine):
+    def __init__(self):
+        self.templates = []
+
+    def render(self, template, template_variables, template_path):
+        self.templates.append(template)
+        return super(RecordingGenshiEngine, self).render(template, template_variables, template_path)
+
+    def stream(self, template, template_variables, template_path):
+        self.templates.append(template)
+        return super(RecordingGenshiEngine, self).stream(template, template_variables, template_path)
+
+
+class FormTemplateEngineTest(PythonicTestCase):
+    def setUp(self):
+        self.genshi_engine = get_template_engine('genshi')
+        self.recording_engine = RecordingGenshiEngine()
+        register_template_engine('genshi', self.recording_engine)
+
+        self.template_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        register_template_engine('genshi', self.genshi_engine)
+        shutil.rmtree(self.template_dir)
+
+    def test_children_use_template_engine_of_form(self):
+        form = Form(template_engine='genshi', children=(
+            TextField('name'),
+            ListField('items', children=(TextField('title'), )),
+        ))
+        html = six.text_type(form.display({'name': 'foo', 'items': [{'title': 'bar'}]}))
+        assert_equals(['form.genshi', 'textlike_input_field.genshi', 'list_field.genshi',
+                       'textlike_input_field.genshi'], self.recording_engine.templates)
+        jinja_form = Form(template_engine='jinja2', children=(
+            TextField('name'),
+            ListField('items', children=(TextField('title'), )),
+        ))
+        jinja_html = jinja_form.display({'name': 'foo', 'items': [{'title': 'bar'}]})
+        assert_same_html(jinja_html, html)
+
+    def test_children_of_blueprints_use_template_engine_of_form(self):
+        class GenshiContactForm(Form):
+            template_engine = 'genshi'
+            children = (TextField('name'), )
+        six.text_type(GenshiContactForm.blueprint().bind().display())
+        assert_equals(['form.genshi', 'textlike_input_field.genshi'], self.recording_engine.templates)
+
+    def test_explicit_template_engine_overrides_inherited_engine(self):
+        form = Form(template_engine='genshi', children=(
+            TextField('name', template_engine='jinja2'),
+        ))
+        assert_equals('jinja2', form.children[0].resolved_template_engine())
+        six.text_type(form.display())
+        assert_equals(['form.genshi'], self.recording_engine.templates)
+
+    def test_widgets_without_parent_use_jinja2(self):
+        assert_equals('jinja2', TextField('name').resolved_template_engine())
+
+    def test_custom_templates_do_not_inherit_template_engine(self):
+        form = Form(template_engine='genshi', children=(
+            Widget(template=StringIO(u'{{ value }}')),
+        ))
+        assert_equals('jinja2', form.children[0].resolved_template_engine())
+
+    def test_widgets_without_template_for_engine_of_form_use_jinja2(self):
+        write_template(self.template_dir, 'custom.jinja2', u'<b>{{ value }}</b>')
+        class CustomField(InputWidget):
+            template_name = 'custom'
+            _template_path = self.template_dir
+
+        for engine in ('genshi', 'native'):
+            form = Form(template_engine=engine, children=(CustomField('custom'), ))
+            assert_equals('jinja2', form.children[0].resolved_template_engine())
+            html = six.text_type(form.display({'custom': 'foo'}))
+            assert_contains(u'<b>foo</b>', html)
+            assert_equals(html, u''.join(form.display_stream({'custom': 'foo'})))
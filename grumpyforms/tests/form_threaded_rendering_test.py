@@ -0,0 +1,71 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from unittest import skipIf
+
+from pycerberus.validators import IntegerValidator
+from pythonic_testcase import *
+import six
+
+from grumpyforms.api import Form
+from grumpyforms.fields import ListField, TextField
+if not six.PY2:
+    from concurrent.futures import ThreadPoolExecutor
+
+
+class OrderForm(Form):
+    template_engine = 'jinja2'
+    children = (
+        TextField('customer', id='customer'),
+        TextField('amount', validator=IntegerValidator()),
+        ListField('items', children=(TextField('title'), )),
+    )
+
+
+def order_values(nr):
+    items = [{'title': 'item %d/%d' % (nr, i)} for i in range(nr % 4)]
+    return {'customer': 'customer %d' % nr, 'amount': str(nr), 'items': items}
+
+
+class FormContextRenderingTest(PythonicTestCase):
+    def test_renders_form_with_explicit_context(self):
+        form = OrderForm()
+        context = form.validate(order_values(2))
+        html = form.display_for(context)
+
+        assert_contains(u'value="customer 2"', html)
+        assert_contains(u'name="items-1.title" value="item 2/0"', html)
+        assert_contains(u'name="items-2.title" value="item 2/1"', html)
+        assert_equals(html, u''.join(form.display_stream_for(context)))
+        # no widget was modified
+        assert_none(form.context.children['customer'].value)
+        assert_none(form.children[0].context.value)
+        list_field = form.children[2]
+        assert_equals(0, list_field.context.count)
+        assert_equals(('items-0', ), list_field.path())
+
+    def test_produces_same_markup_as_set_context(self):
+        for nr in range(4):
+            form = OrderForm()
+            form.set_context(form.validate(order_values(nr)))
+            shared_form = OrderForm.blueprint()
+            context = shared_form.validate(order_values(nr))
+            assert_equals(form.display(), shared_form.display_for(context))
+
+    @skipIf(six.PY2, 'ThreadPoolExecutor requires Python 3')
+    def test_can_render_shared_form_concurrently(self):
+        form = OrderForm()
+        requests = [order_values(nr) for nr in range(200)]
+        expected = []
+        for values in requests:
+            request_form = OrderForm()
+            request_form.set_context(request_form.validate(values))
+            expected.append(request_form.display())
+
+        def render(values):
+            context = form.validate(values)
+            return u''.join(form.display_stream_for(context))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(render, requests))
+        assert_equals(expected, results)
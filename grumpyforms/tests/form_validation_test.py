@@ -2,13 +2,17 @@
 # The source code contained in this file is licensed under the MIT license.
 # See LICENSE.txt in the main project directory, for more information.
 
+from unittest import skipIf
+
 from pycerberus.api import Validator
+from pycerberus.lib.form_data import FieldData
 from pycerberus.schema import SchemaValidator
 from pycerberus.validators import IntegerValidator
 from pythonic_testcase import *
+import six
 
 from grumpyforms.api import Form
-from grumpyforms.fields import TextField
+from grumpyforms.fields import ListField, TextField
 
 
 class FormValidationTest(PythonicTestCase):
@@ -114,3 +118,185 @@ class FormsWithValidationSchemasTest(PythonicTestCase):
         assert_equals(dict(a='2', b='2', c='ab'),
                       string_schema.process(dict(a='2', b='2', c='ab')))
 
+
+
+class FormValidationSchemaCacheTest(PythonicTestCase):
+    class NumberForm(Form):
+        children = (
+            TextField('a', validator=IntegerValidator()),
+            TextField('b'),
+        )
+
+    def test_builds_validation_schema_only_once(self):
+        form = self.NumberForm()
+        schema = form._cached_validation_schema()
+        assert_true(form._cached_validation_schema() is schema)
+        assert_true(form.bind()._cached_validation_schema() is schema)
+        # shared by all instances with the same validators
+        assert_true(self.NumberForm()._cached_validation_schema() is schema)
+
+        assert_equals({'a': 1, 'b': 'x'}, form.validate({'a': '1', 'b': 'x'}).value)
+        assert_equals({'a': 2, 'b': 'y'}, form.validate({'a': '2', 'b': 'y'}).value)
+
+    def test_rebuilds_schema_when_validators_change(self):
+        form = self.NumberForm()
+        assert_equals({'a': 1, 'b': '2'}, form.validate({'a': '1', 'b': '2'}).value)
+
+        form.children[1].validator = IntegerValidator()
+        assert_equals({'a': 1, 'b': 2}, form.validate({'a': '1', 'b': '2'}).value)
+
+        form.children[1].name = 'c'
+        assert_equals({'a': 1, 'c': 2}, form.validate({'a': '1', 'c': '2'}).value)
+
+        schema = form._cached_validation_schema()
+        form.validator = SchemaValidator()
+        assert_false(form._cached_validation_schema() is schema)
+
+
+class FormFieldValidationTest(PythonicTestCase):
+    class OrderForm(Form):
+        children = (
+            TextField('customer'),
+            TextField('amount', validator=IntegerValidator()),
+            Form('address', children=(TextField('zip', validator=IntegerValidator()), )),
+            ListField('items', children=(
+                TextField('title'),
+                TextField('price', validator=IntegerValidator()),
+            )),
+        )
+
+    def setUp(self):
+        self.form = self.OrderForm()
+
+    def test_can_validate_single_field(self):
+        context = self.form.validate_field('amount', '42')
+        assert_isinstance(context, FieldData)
+        assert_equals(42, context.value)
+        assert_equals('42', context.initial_value)
+
+        context = self.form.validate_field('amount', 'invalid')
+        assert_true(context.contains_errors())
+
+    def test_can_validate_fields_in_nested_containers(self):
+        assert_equals(12345, self.form.validate_field('address.zip', '12345').value)
+        assert_equals(42, self.form.validate_field('items-3.price', '42').value)
+        assert_true(self.form.validate_field('items-1.price', 'abc').contains_errors())
+
+    def test_resolves_paths_as_returned_by_full_name(self):
+        bound_form = self.form.bind()
+        bound_form.set_context(bound_form.validate({'items': [{'title': 'foo', 'price': '1'}]}))
+        list_field = tuple(bound_form.children_())[3]
+        price_field = tuple(list_field.child_rows())[0][1]
+        assert_equals('items-1.price', price_field.full_name())
+        assert_true(self.form.widget_by_path('items-1.price') is self.form.children[3].children[1])
+
+    def test_resolves_fields_in_unnamed_sub_forms(self):
+        form = Form(children=(
+            TextField('a'),
+            Form(children=(TextField('z', validator=IntegerValidator()), )),
+        ))
+        z_field = form.children[1].children[0]
+        assert_equals('z', z_field.full_name())
+        assert_true(form.widget_by_path('z') is z_field)
+        assert_equals(42, form.validate_field('z', '42').value)
+        assert_equals({'z': '42'}, form.decode({'z': '42'}))
+
+    def test_raises_error_for_unknown_paths(self):
+        for path in ('invalid', 'items.price', 'items-1.invalid', 'amount-1', 'items-1'):
+            assert_raises(ValueError, lambda: self.form.validate_field(path, '42'))
+
+
+class FormFailFastValidationTest(PythonicTestCase):
+    class OrderForm(Form):
+        children = (
+            TextField('amount', validator=IntegerValidator()),
+            TextField('price', validator=IntegerValidator()),
+            ListField('items', children=(
+                TextField('title'),
+                TextField('quantity', validator=IntegerValidator()),
+            )),
+        )
+
+    def test_returns_same_values_as_regular_validation(self):
+        form = self.OrderForm()
+        values = {'amount': '1', 'price': '2', 'items': [{'title': 'foo', 'quantity': '3'}]}
+        context = form.validate(values, fail_fast=True)
+        assert_false(context.contains_errors())
+        assert_equals(form.validate(values).value, context.value)
+        assert_equals({'amount': 1, 'price': 2, 'items': ({'title': 'foo', 'quantity': 3}, )},
+                      context.value)
+
+    def test_stops_at_first_error(self):
+        checked = []
+        class TracingValidator(IntegerValidator):
+            def process(self, value, *args, **kwargs):
+                checked.append(value)
+                return super(TracingValidator, self).process(value, *args, **kwargs)
+        form = Form(children=(
+            TextField('a', validator=TracingValidator()),
+            TextField('b', validator=TracingValidator()),
+            TextField('c', validator=TracingValidator()),
+        ))
+
+        context = form.validate({'a': '1', 'b': 'invalid', 'c': 'invalid'}, fail_fast=True)
+        assert_equals(['1', 'invalid'], checked)
+        assert_true(context.contains_errors())
+        assert_equals(['b'], list(context.errors))
+        assert_equals('invalid', context.children['b'].initial_value)
+        assert_equals('1', context.children['a'].initial_value)
+        assert_none(context.children['c'].initial_value)
+
+    def test_stops_at_first_error_in_list_field(self):
+        form = self.OrderForm()
+        items = [{'title': 'foo', 'quantity': '1'}, {'title': 'bar', 'quantity': 'x'}]
+        items += [{'title': 'baz', 'quantity': 'y'}] * 10
+        context = form.validate({'amount': '1', 'price': '2', 'items': items}, fail_fast=True)
+
+        assert_true(context.contains_errors())
+        items_context = context.children['items']
+        # no context for the rows after the invalid one
+        assert_length(2, items_context.items)
+        assert_equals(1, items_context.error_count)
+        assert_true(items_context.items[1].children['quantity'].contains_errors())
+
+    def test_fail_fast_treats_missing_list_field_as_empty(self):
+        form = Form(children=(
+            TextField('name'),
+            ListField('items', children=(TextField('quantity'), )),
+        ))
+        context = form.validate({'name': 'foo'}, fail_fast=True)
+        assert_false(context.contains_errors())
+        assert_equals(form.validate({'name': 'foo'}).value, context.value)
+        assert_equals({'name': 'foo', 'items': ()}, context.value)
+
+        context = form.validate({'name': 'foo', 'items': None}, fail_fast=True)
+        assert_equals({'name': 'foo', 'items': ()}, context.value)
+
+    def test_uses_form_validators(self):
+        class MatchingFieldsSchema(SchemaValidator):
+            formvalidators = (FormsWithValidationSchemasTest.AEqualsB(), )
+        form = Form(validator=MatchingFieldsSchema(), children=(
+            TextField('a', validator=IntegerValidator()),
+            TextField('b', validator=IntegerValidator()),
+        ))
+        assert_false(form.validate({'a': '1', 'b': '1'}, fail_fast=True).contains_errors())
+        assert_true(form.validate({'a': '1', 'b': '2'}, fail_fast=True).contains_errors())
+
+    def test_validates_children_only_once_with_form_validators(self):
+        checked = []
+        class TracingValidator(IntegerValidator):
+            def process(self, value, *args, **kwargs):
+                checked.append(value)
+                return super(TracingValidator, self).process(value, *args, **kwargs)
+        form = Form(validator=SchemaValidator(), children=(
+            TextField('a', validator=TracingValidator()),
+        ))
+        assert_equals({'a': 1}, form.validate({'a': '1'}, fail_fast=True).value)
+        assert_equals(['1'], checked)
+
+    @skipIf(not six.PY2, 'only relevant for Python 2')
+    def test_raises_error_for_async_validation_on_python2(self):
+        form = Form(children=(TextField('name'), ))
+        e = assert_raises(RuntimeError, lambda: form.validate_async({'name': 'foo'}))
+        assert_equals('async validation requires Python 3', e.args[0])
+        assert_raises(RuntimeError, lambda: form.children[0].validate_async('foo'))
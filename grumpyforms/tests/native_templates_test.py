@@ -0,0 +1,96 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from pycerberus.validators import IntegerValidator
+from pythonic_testcase import *
+
+from grumpyforms.api import Form
+from grumpyforms.fields import (Checkbox, EmailField, HiddenField, ListField,
+    PasswordField, Radiobutton, SelectField, SubmitButton, TextArea, TextField)
+from grumpywidgets.widgets import Label
+
+
+class NativeTemplatesTest(PythonicTestCase):
+    """The "native" engine must produce exactly the same markup as the Jinja2
+    templates."""
+
+    def assert_same_output(self, build_widget, *args, **kwargs):
+        jinja_html = build_widget('jinja2').display(*args, **kwargs)
+        native_html = build_widget('native').display(*args, **kwargs)
+        assert_equals(jinja_html, native_html)
+
+    def test_label(self):
+        self.assert_same_output(lambda engine: Label(template_engine=engine))
+        self.assert_same_output(lambda engine: Label(template_engine=engine,
+            id='foo', for_='bar', css_classes=('a', 'b')), 'text')
+
+    def test_text_like_fields(self):
+        for field_class in (TextField, HiddenField, PasswordField, EmailField):
+            self.assert_same_output(lambda engine: field_class(template_engine=engine))
+            self.assert_same_output(lambda engine: field_class('foo',
+                template_engine=engine, id='foo-id', css_classes=('a', ),
+                attrs={'autocomplete': 'off', 'data-x': 'y'}), 'bar')
+
+    def test_checkbox_and_radiobutton(self):
+        for field_class in (Checkbox, Radiobutton):
+            self.assert_same_output(lambda engine: field_class(template_engine=engine))
+            self.assert_same_output(lambda engine: field_class('foo',
+                template_engine=engine, id='foo-id', option_value=0,
+                css_classes=('a', )), True)
+        self.assert_same_output(lambda engine: Checkbox(template_engine=engine,
+            disabled=True), False)
+        self.assert_same_output(lambda engine: Radiobutton(template_engine=engine,
+            attrs={'foo': 'bar'}), False)
+
+    def test_select_field(self):
+        options = ((1, 'one'), (2, 'two'))
+        self.assert_same_output(lambda engine: SelectField(template_engine=engine))
+        self.assert_same_output(lambda engine: SelectField('foo',
+            template_engine=engine, options=options, id='foo-id',
+            css_classes=('a', ), attrs={'size': 2}), 2)
+
+    def test_submit_button(self):
+        self.assert_same_output(lambda engine: SubmitButton(template_engine=engine))
+        self.assert_same_output(lambda engine: SubmitButton('foo',
+            template_engine=engine, value='Save', id='foo-id',
+            attrs={'class': 'x'}))
+
+    def test_textarea(self):
+        self.assert_same_output(lambda engine: TextArea(template_engine=engine))
+        self.assert_same_output(lambda engine: TextArea('foo',
+            template_engine=engine, id='foo-id', cols=None, css_classes=('a', ),
+            attrs={'wrap': 'hard'}), 'some\ntext')
+
+    def test_form(self):
+        def build_form(engine):
+            return Form(template_engine=engine, id='form-id', enctype='text/plain',
+                children=(
+                    TextField('foo', id='foo', label='Foo',
+                        validator=IntegerValidator(), container_attrs={'x': '<&>'}),
+                    HiddenField('bar'),
+                    SubmitButton('save', value='Save'),
+                ))
+        self.assert_same_output(build_form)
+
+        invalid_form = build_form('jinja2')
+        native_form = build_form('native')
+        for form in (invalid_form, native_form):
+            form.set_context(form.validate({'foo': 'invalid'}))
+        assert_true(invalid_form.context.contains_errors())
+        assert_equals(invalid_form.display(), native_form.display())
+
+    def test_list_field(self):
+        def build_list_field(engine):
+            return ListField('items', template_engine=engine, id='items', children=(
+                TextField('name', id='name'),
+                Checkbox('active'),
+            ))
+        self.assert_same_output(build_list_field)
+        self.assert_same_output(build_list_field,
+            [{'name': 'foo', 'active': True}, {'name': 'bar', 'active': False}])
+
+    def test_raises_error_for_unknown_native_template(self):
+        label = Label(template_engine='native', template_name='invalid')
+        e = assert_raises(ValueError, lambda: label.display())
+        assert_equals('unknown native template invalid', e.args[0])
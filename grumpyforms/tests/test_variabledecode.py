@@ -1,7 +1,9 @@
 from __future__ import absolute_import
 import unittest
 
-from grumpyforms.variabledecode import variable_decode, variable_encode
+from grumpyforms.variabledecode import (variable_decode, variable_decode_pairs,
+    variable_decode_urlencoded, variable_encode, variable_encode_pairs,
+    DecodeLimitError)
 
 
 class TestVariableDecode(unittest.TestCase):
@@ -54,6 +56,137 @@ class TestVariableDecode(unittest.TestCase):
 
         self.assertEqual(expect, variable_decode(src))
 
+    def test_list_decode_with_repetitions(self):
+        src = {'a-1': 'b', 'a-0': 'a', 'a--repetitions': '4'}
+        expect = {'a': ['a', 'b', '', '']}
+
+        self.assertEqual(expect, variable_decode(src))
+
+    def test_nested_list_decode_with_repetitions(self):
+        src = {'a-0.b-1': 'x', 'a-0.b-0': 'y', 'a-0.b--repetitions': '3'}
+        expect = {'a': [{'b': ['y', 'x', '']}]}
+
+        self.assertEqual(expect, variable_decode(src))
+
+    def test_repetitions_turn_parent_into_list(self):
+        src = {'x-0.a--repetitions': '2', 'x.foo': 'bar'}
+        expect = {'x': ['bar']}
+
+        self.assertEqual(expect, variable_decode(src))
+
+    def test_list_decode_sorts_numerically(self):
+        src = {'a-10': 'x', 'a-2': 'y', 'a-b': 'z'}
+        expect = {'a': ['y', 'x'], 'a-b': 'z'}
+
+        self.assertEqual(expect, variable_decode(src))
+
+    def test_dict_decode_with_value_for_parent(self):
+        src = {'a.b': 'c', 'a': 'd'}
+        expect = {'a': {'b': 'c', None: 'd'}}
+
+        self.assertEqual(expect, variable_decode(src))
+
+    def test_list_decode_with_value_for_parent(self):
+        src = {'a': ['x'], 'a-0': 'z'}
+        expect = {'a': ['x', 'z']}
+
+        self.assertEqual(expect, variable_decode(src))
+
+    def test_deeply_nested_list_decode(self):
+        depth = 2000
+        src = {'.'.join(['a-0'] * depth): 'x'}
+        result = variable_decode(src)
+        for i in range(depth - 1):
+            self.assertEqual(1, len(result['a']))
+            result = result['a'][0]
+        self.assertEqual({'a': ['x']}, result)
+
+
+class TestVariableDecodeLimits(unittest.TestCase):
+
+    def test_max_keys(self):
+        src = {'a': '1', 'b': '2', 'c': '3'}
+
+        self.assertEqual(src, variable_decode(src, max_keys=3))
+        self.assertRaises(DecodeLimitError, variable_decode, src, max_keys=2)
+
+    def test_max_depth(self):
+        self.assertEqual({'a': {'b': 'c'}}, variable_decode({'a.b': 'c'}, max_depth=2))
+        self.assertRaises(DecodeLimitError, variable_decode, {'a.b.c': 'd'}, max_depth=2)
+        # list indexes add a nesting level
+        self.assertEqual({'a': ['b']}, variable_decode({'a-0': 'b'}, max_depth=2))
+        self.assertRaises(DecodeLimitError, variable_decode, {'a.b-0': 'c'}, max_depth=2)
+
+    def test_max_list_length(self):
+        src = {'a-0': 'a', 'a-1': 'b', 'a-99': 'c'}
+
+        self.assertEqual({'a': ['a', 'b', 'c']}, variable_decode(src, max_list_length=3))
+        self.assertRaises(DecodeLimitError, variable_decode, src, max_list_length=2)
+
+    def test_max_list_length_includes_repetitions(self):
+        src = {'a-0': 'a', 'a--repetitions': '5'}
+
+        self.assertEqual({'a': ['a', '', '', '', '']}, variable_decode(src, max_list_length=5))
+        self.assertRaises(DecodeLimitError, variable_decode, src, max_list_length=4)
+
+    def test_max_repetitions(self):
+        src = {'a-0': 'a', 'a--repetitions': '100000000'}
+
+        self.assertRaises(DecodeLimitError, variable_decode, src, max_repetitions=1000)
+        self.assertEqual({'a': ['a', '']},
+            variable_decode({'a-0': 'a', 'a--repetitions': '2'}, max_repetitions=2))
+
+    def test_limit_error_is_value_error(self):
+        self.assertTrue(issubclass(DecodeLimitError, ValueError))
+
+
+class TestVariableDecodePairs(unittest.TestCase):
+
+    def test_pairs_decode(self):
+        src = [('a-1.name', 'b'), ('a-0.name', 'a'), ('b', 'c'), ('a--repetitions', '3')]
+        expect = {'a': [{'name': 'a'}, {'name': 'b'}, ''], 'b': 'c'}
+
+        self.assertEqual(expect, variable_decode_pairs(src))
+        self.assertEqual(variable_decode(dict(src)), variable_decode_pairs(src))
+
+    def test_pairs_decode_collects_repeated_keys(self):
+        src = [('id', '10'), ('id', '20'), ('a.b', 'x'), ('a.b', 'y'), ('id', '30')]
+        expect = {'id': ['10', '20', '30'], 'a': {'b': ['x', 'y']}}
+
+        self.assertEqual(expect, variable_decode_pairs(src))
+        self.assertEqual(variable_decode({'id': ['10', '20', '30'], 'a.b': ['x', 'y']}),
+            variable_decode_pairs(src))
+
+    def test_pairs_decode_collects_repeated_values_for_parent(self):
+        src = [('a.b', 'c'), ('a', 'd'), ('a', 'e')]
+        expect = {'a': {'b': 'c', None: ['d', 'e']}}
+
+        self.assertEqual(expect, variable_decode_pairs(src))
+
+    def test_pairs_decode_applies_limits(self):
+        src = iter([('a', '1'), ('b', '2'), ('c', '3')])
+
+        self.assertRaises(DecodeLimitError, variable_decode_pairs, src, max_keys=2)
+
+    def test_urlencoded_decode(self):
+        body = b'a-0.name=foo+bar&a-1.name=%C3%A4&id=10&id=20&&empty=&flag'
+        expect = {'a': [{'name': 'foo bar'}, {'name': u'\xe4'}],
+                  'id': ['10', '20'], 'empty': '', 'flag': ''}
+
+        self.assertEqual(expect, variable_decode_urlencoded(body))
+        self.assertEqual(expect, variable_decode_urlencoded(memoryview(body)))
+
+    def test_urlencoded_decode_unquotes_keys(self):
+        body = b'a%2D0=x&b%2Ec=y'
+        expect = {'a': ['x'], 'b': {'c': 'y'}}
+
+        self.assertEqual(expect, variable_decode_urlencoded(body))
+
+    def test_urlencoded_decode_applies_limits(self):
+        body = b'a.b.c=d'
+
+        self.assertRaises(DecodeLimitError, variable_decode_urlencoded, body, max_depth=2)
+
 
 class TestVariableEncode(unittest.TestCase):
 
@@ -74,3 +207,43 @@ class TestVariableEncode(unittest.TestCase):
         expect = {'a.a': 'a', 'a.b': 'b', 'a.c': 'c'}
 
         self.assertEqual(expect, variable_encode(src))
+
+    def test_top_level_list_encode(self):
+        src = [{'a': 'x'}, 'y']
+        expect = {'__repetitions__': '2', '-0.a': 'x', '-1': 'y'}
+
+        self.assertEqual(expect, variable_encode(src))
+        self.assertEqual({'p-0': 'x', 'p--repetitions': '1'},
+            variable_encode(['x'], prepend='p'))
+
+    def test_encode_value_for_parent(self):
+        src = {'a': {'b': 'c', None: 'd'}}
+        expect = {'a.b': 'c', 'a': 'd'}
+
+        self.assertEqual(expect, variable_encode(src))
+
+    def test_encode_without_repetitions_into_existing_dict(self):
+        result = {'x': 'y'}
+        src = {'a': [['b']]}
+
+        self.assertEqual({'x': 'y', 'a-0-0': 'b'},
+            variable_encode(src, result=result, add_repetitions=False))
+        self.assertEqual({'x': 'y', 'a-0-0': 'b'}, result)
+
+    def test_encode_pairs(self):
+        src = {'a': [{'b': 'x'}, 'y'], 'c': 'z'}
+        pairs = variable_encode_pairs(src)
+
+        self.assertEqual(('a-0.b', 'x'), next(pairs))
+        self.assertEqual(
+            [('a-1', 'y'), ('a--repetitions', '2'), ('c', 'z')], list(pairs))
+        self.assertEqual(variable_encode(src), dict(variable_encode_pairs(src)))
+
+    def test_encode_deeply_nested_structure(self):
+        depth = 5000
+        src = 'x'
+        for i in range(depth):
+            src = {'a': [src]}
+        result = variable_encode(src, add_repetitions=False)
+
+        self.assertEqual({'.'.join(['a-0'] * depth): 'x'}, result)
@@ -8,9 +8,11 @@ the value ``a`` is a dictionary with a key ``b``, and ``b``
 is a list, the third(-ish) element with the value ``something``.
 Numbers are used to sort, missing numbers are ignored.
 
-This doesn't deal with multiple keys, like in a query string of
-``id=10&id=20``, which returns something like ``{'id': ['10',
-'20']}``.  That's left to someplace else to interpret.  If you want to
+``variable_decode`` doesn't deal with multiple keys, like in a query
+string of ``id=10&id=20``, which returns something like ``{'id': ['10',
+'20']}``.  That's left to someplace else to interpret (or use
+``variable_decode_pairs``/``variable_decode_urlencoded`` which decode
+key/value pairs or a raw request body directly).  If you want to
 represent lists in this model, you use indexes, and the lists are
 explicitly ordered.
 
@@ -21,12 +23,28 @@ and list_char keyword args. For example, to have the GET/POST variables,
 """
 from __future__ import absolute_import
 
+import re
+
 import six
 from six.moves import range
+if six.PY2:
+    from urllib import unquote as unquote_to_bytes
+else:
+    from urllib.parse import unquote_to_bytes
+
+__all__ = ['parse_urlencoded', 'variable_decode', 'variable_decode_pairs',
+           'variable_decode_urlencoded', 'variable_encode',
+           'variable_encode_pairs', 'DecodeLimitError']
+
 
-__all__ = ['variable_decode', 'variable_encode']
+class DecodeLimitError(ValueError):
+    """Raised if the input exceeds one of the limits passed to
+    ``variable_decode`` (e.g. ``max_keys``)."""
+    pass
 
 
+_missing = object()
+
 def _sort_key(item):
     """Robust sort key that sorts items with invalid keys last.
 
@@ -36,20 +54,97 @@ def _sort_key(item):
     return not isinstance(key, int), key
 
 
-def variable_decode(d, dict_char='.', list_char='-'):
-    """Decode the flat dictionary d into a nested structure."""
+def variable_decode(d, dict_char='.', list_char='-', max_keys=None,
+                    max_depth=None, max_list_length=None, max_repetitions=None):
+    """Decode the flat dictionary d into a nested structure.
+
+    The optional limits protect against hostile input and are checked before
+    any memory is allocated for the offending item:
+
+    - ``max_keys``: maximum number of keys in d
+    - ``max_depth``: maximum nesting level of a key (``a.b-3`` has 3 levels)
+    - ``max_list_length``: maximum number of items in a decoded list
+      (including the items added by ``--repetitions``)
+    - ``max_repetitions``: maximum value of a ``--repetitions`` key
+
+    A ``DecodeLimitError`` (subclass of ``ValueError``) is raised if the input
+    exceeds any of these limits."""
+    return _decode_items(six.iteritems(d), dict_char, list_char,
+        max_keys=max_keys, max_depth=max_depth,
+        max_list_length=max_list_length, max_repetitions=max_repetitions)
+
+
+def variable_decode_pairs(pairs, dict_char='.', list_char='-', **limits):
+    """Decode an iterable of ``(key, value)`` pairs (e.g. a parsed query
+    string) into a nested structure without building a flat dictionary
+    first. Accepts the same limits as ``variable_decode``.
+
+    Values of repeated keys are collected in a list so ``id=10&id=20``
+    returns ``{'id': ['10', '20']}``."""
+    return _decode_items(pairs, dict_char, list_char, merge_repeated=True, **limits)
+
+
+_urlencoded_field = re.compile(b'[^&]+')
+
+def variable_decode_urlencoded(body, encoding='utf-8', errors='replace',
+                               dict_char='.', list_char='-', **limits):
+    """Decode a raw ``application/x-www-form-urlencoded`` body (bytes or
+    memoryview) into a nested structure (see ``variable_decode_pairs``).
+
+    The body is parsed lazily while decoding so no intermediate dictionary
+    (or list of all fields) is built."""
+    return variable_decode_pairs(
+        parse_urlencoded(body, encoding, errors), dict_char, list_char, **limits)
+
+
+def parse_urlencoded(body, encoding='utf-8', errors='replace'):
+    """Return an iterator of (unquoted) ``(key, value)`` pairs from a raw
+    ``application/x-www-form-urlencoded`` body (bytes or memoryview)."""
+    if six.PY2 and isinstance(body, memoryview):
+        # Python 2's "re" module does not support memoryview
+        body = body.tobytes()
+    for match in _urlencoded_field.finditer(body):
+        key, _, value = match.group().partition(b'=')
+        yield (_unquote(key, encoding, errors), _unquote(value, encoding, errors))
+
+
+def _unquote(value, encoding, errors):
+    return unquote_to_bytes(value.replace(b'+', b' ')).decode(encoding, errors)
+
+
+def _decode_items(items, dict_char, list_char, max_keys=None, max_depth=None,
+                  max_list_length=None, max_repetitions=None, merge_repeated=False):
+    # Single pass over all items which builds the nested structure (list-like
+    # values are dicts with integer keys at first). All dicts which become
+    # lists are tracked by identity (along with their depth) so they can be
+    # converted bottom-up without walking the tree again for every key.
+    # Runtime is linear in the size of the input (plus sorting each list).
     result = {}
-    dicts_to_sort = set()
-    known_lengths = {}
-    for key, value in six.iteritems(d):
-        keys = key.split(dict_char)
+    # id(node) -> (depth, parent, key, node)
+    list_nodes = {}
+    # (keys, list depths) for "--repetitions" items
+    repetition_keys = []
+    known_lengths = []
+    nr_keys = 0
+    for key, value in items:
+        nr_keys += 1
+        if (max_keys is not None) and (nr_keys > max_keys):
+            raise DecodeLimitError('too many keys (max_keys=%d)' % max_keys)
+        if (max_depth is not None) and (key.count(dict_char) >= max_depth):
+            raise DecodeLimitError('key nested too deeply (max_depth=%d)' % max_depth)
         new_keys = []
+        # path length of each dict which becomes a list
+        list_depths = []
         was_repetition_count = False
-        for key in keys:
-            if key.endswith('--repetitions'):
+        maybe_repetitions = ('--repetitions' in key)
+        for key in key.split(dict_char):
+            if maybe_repetitions and key.endswith('--repetitions'):
                 key = key[:-len('--repetitions')]
                 new_keys.append(key)
-                known_lengths[tuple(new_keys)] = int(value)
+                repetitions = int(value)
+                if (max_repetitions is not None) and (repetitions > max_repetitions):
+                    raise DecodeLimitError('too many repetitions (max_repetitions=%d)' % max_repetitions)
+                known_lengths.append((new_keys, repetitions))
                 was_repetition_count = True
                 break
             elif list_char in key:
@@ -59,86 +154,182 @@ def variable_decode(d, dict_char='.', list_char='-'):
                 else:
                     key = maybe_key
                     new_keys.append(key)
-                    dicts_to_sort.add(tuple(new_keys))
+                    list_depths.append(len(new_keys))
                     new_keys.append(int(index))
             else:
                 new_keys.append(key)
+        if (max_depth is not None) and (len(new_keys) > max_depth):
+            # list indexes add a nesting level as well
+            raise DecodeLimitError('key nested too deeply (max_depth=%d)' % max_depth)
         if was_repetition_count:
+            if list_depths:
+                repetition_keys.append((new_keys, list_depths))
             continue
 
         place = result
-        for i in range(len(new_keys) - 1):
-            try:
-                if not isinstance(place[new_keys[i]], dict):
-                    place[new_keys[i]] = {None: place[new_keys[i]]}
-                place = place[new_keys[i]]
-            except KeyError:
-                place[new_keys[i]] = {}
-                place = place[new_keys[i]]
-        if new_keys[-1] in place:
-            if isinstance(place[new_keys[-1]], dict):
-                place[new_keys[-1]][None] = value
-            elif isinstance(place[new_keys[-1]], list):
+        last_key = new_keys.pop()
+        list_index = 0
+        next_list_depth = list_depths[0] if list_depths else None
+        for depth, key in enumerate(new_keys, 1):
+            child = place.get(key, _missing)
+            if child is _missing:
+                child = place[key] = {}
+            elif not isinstance(child, dict):
+                child = place[key] = {None: child}
+            if depth == next_list_depth:
+                list_nodes[id(child)] = (depth, place, key, child)
+                list_index += 1
+                next_list_depth = list_depths[list_index] if (list_index < len(list_depths)) else None
+            place = child
+        if last_key in place:
+            previous = place[last_key]
+            if isinstance(previous, dict):
+                if merge_repeated and (None in previous):
+                    previous[None] = _merged(previous[None], value)
+                else:
+                    previous[None] = value
+            elif isinstance(previous, list):
                 if isinstance(value, list):
-                    place[new_keys[-1]].extend(value)
+                    previous.extend(value)
                 else:
-                    place[new_keys[-1]].append(value)
+                    previous.append(value)
             else:
                 if isinstance(value, list):
-                    place[new_keys[-1]] = [place[new_keys[-1]]]
-                    place[new_keys[-1]].extend(value)
+                    place[last_key] = [previous]
+                    place[last_key].extend(value)
                 else:
-                    place[new_keys[-1]] = [place[new_keys[-1]], value]
-        else:
-            place[new_keys[-1]] = value
-
-    to_sort_list = sorted(dicts_to_sort, key=len, reverse=True)
-    for key in to_sort_list:
-        to_sort = result
-        source = None
-        last_key = None
-        for sub_key in key:
-            source = to_sort
-            last_key = sub_key
-            to_sort = to_sort[sub_key]
-        if None in to_sort:
-            none_values = [(0, x) for x in to_sort.pop(None)]
-            none_values.extend(six.iteritems(to_sort))
-            to_sort = none_values
+                    place[last_key] = [previous, value]
         else:
-            to_sort = six.iteritems(to_sort)
-        to_sort = [x[1] for x in sorted(to_sort, key=_sort_key)]
-        if key in known_lengths:
-            if len(to_sort) < known_lengths[key]:
-                to_sort.extend([''] * (known_lengths[key] - len(to_sort)))
-        source[last_key] = to_sort
+            place[last_key] = value
 
+    # "a-0.b--repetitions" turns "a" into a list even if there is no other
+    # item for "a-<n>" (if "a" exists at all).
+    for new_keys, list_depths in repetition_keys:
+        place = result
+        depths = iter(list_depths)
+        next_list_depth = next(depths)
+        for i in range(list_depths[-1]):
+            parent = place
+            place = place[new_keys[i]]
+            if i + 1 == next_list_depth:
+                list_nodes[id(place)] = (i + 1, parent, new_keys[i], place)
+                next_list_depth = next(depths, None)
+
+    lengths = {}
+    for new_keys, length in known_lengths:
+        node = _lookup(result, new_keys)
+        if (node is not None) and (id(node) in list_nodes):
+            lengths[id(node)] = length
+
+    nodes_by_depth = {}
+    for list_node in list_nodes.values():
+        nodes_by_depth.setdefault(list_node[0], []).append(list_node)
+    for depth in sorted(nodes_by_depth, reverse=True):
+        for _, parent, key, node in nodes_by_depth[depth]:
+            parent[key] = _list_values(node, lengths.get(id(node)), max_list_length)
     return result
 
 
+def _merged(previous, value):
+    if not isinstance(previous, list):
+        previous = [previous]
+    if isinstance(value, list):
+        previous.extend(value)
+    else:
+        previous.append(value)
+    return previous
+
+
+def _lookup(result, keys):
+    node = result
+    for key in keys:
+        if (not isinstance(node, dict)) or (key not in node):
+            return None
+        node = node[key]
+    return node
+
+
+def _list_values(node, known_length, max_list_length=None):
+    if max_list_length is not None:
+        length = len(node)
+        if None in node:
+            length += len(node[None]) - 1
+        if (known_length is not None):
+            length = max(length, known_length)
+        if length > max_list_length:
+            raise DecodeLimitError('list too long (max_list_length=%d)' % max_list_length)
+    if None in node:
+        none_values = [(0, x) for x in node.pop(None)]
+        none_values.extend(six.iteritems(node))
+        items = none_values
+    else:
+        items = six.iteritems(node)
+    values = [x[1] for x in sorted(items, key=_sort_key)]
+    if (known_length is not None) and (len(values) < known_length):
+        values.extend([''] * (known_length - len(values)))
+    return values
+
+
 def variable_encode(d, prepend='', result=None, add_repetitions=True,
                     dict_char='.', list_char='-'):
     """Encode a nested structure into a flat dictionary."""
     if result is None:
         result = {}
-    if isinstance(d, dict):
-        for key, value in six.iteritems(d):
-            if key is None:
-                name = prepend
-            elif not prepend:
-                name = key
-            else:
-                name = "%s%s%s" % (prepend, dict_char, key)
-            variable_encode(value, name, result, add_repetitions,
-                            dict_char=dict_char, list_char=list_char)
-    elif isinstance(d, list):
-        for i, value in enumerate(d):
-            variable_encode(value, "%s%s%i" % (prepend, list_char, i), result,
-                add_repetitions, dict_char=dict_char, list_char=list_char)
-        if add_repetitions:
-            rep_name = ('%s--repetitions' % prepend
-                if prepend else '__repetitions__')
-            result[rep_name] = str(len(d))
-    else:
-        result[prepend] = d
+    result.update(variable_encode_pairs(d, prepend, add_repetitions,
+        dict_char=dict_char, list_char=list_char))
     return result
+
+
+def variable_encode_pairs(d, prepend='', add_repetitions=True,
+                          dict_char='.', list_char='-'):
+    """Return an iterator of flat ``(key, value)`` pairs for the nested
+    structure d (the same items as ``variable_encode`` in the same order).
+
+    The structure is traversed iteratively so there is no recursion limit
+    for deeply nested structures."""
+    # One entry per open dict/list: (items iterator, the list or None for
+    # dicts, name, prefix for child names). The prefix is formatted only once
+    # per container.
+    stack = []
+    value, name = d, prepend
+    while True:
+        if isinstance(value, dict):
+            prefix = ('%s%s' % (name, dict_char)) if name else None
+            stack.append((six.iteritems(value), None, name, prefix))
+        elif isinstance(value, list):
+            stack.append((enumerate(value), value, name, '%s%s' % (name, list_char)))
+        else:
+            yield name, value
+        # yield all leaves until the next nested dict/list is found
+        while stack:
+            items, list_, parent_name, prefix = stack[-1]
+            if list_ is None:
+                for key, value in items:
+                    if key is None:
+                        name = parent_name
+                    elif prefix is None:
+                        name = key
+                    else:
+                        name = '%s%s' % (prefix, key)
+                    if isinstance(value, (dict, list)):
+                        break
+                    yield name, value
+                else:
+                    stack.pop()
+                    continue
+            else:
+                for i, value in items:
+                    name = '%s%i' % (prefix, i)
+                    if isinstance(value, (dict, list)):
+                        break
+                    yield name, value
+                else:
+                    stack.pop()
+                    if add_repetitions:
+                        rep_name = ('%s--repetitions' % parent_name
+                            if parent_name else '__repetitions__')
+                        yield rep_name, str(len(list_))
+                    continue
+            break
+        else:
+            return
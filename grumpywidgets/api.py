@@ -5,44 +5,122 @@
 from __future__ import absolute_import
 
 import os
+import weakref
 
 from pycerberus.lib.form_data import FieldData
 import six
 
 from . import template_helpers
-from .genshi_support import render_genshi_template
-from .jinja_support import render_jinja_template
-from .utils import provide_as_dict_item
+from .engines import get_template_engine
+from .template_cache import register_template_path
+from .utils import overrides_display_only, provide_as_dict_item
+if not six.PY2:
+    from .async_support import (child_stream_async, render_template_async,
+        stream_template_async)
 
 
-__all__ = ['Widget']
+__all__ = ['class_attribute_names', 'invalidate_class_attribute_names', 'Widget']
+
+def child_stream(child):
+    return child.display_stream()
+
+# used for widgets without "template_engine" (and without parent widget)
+default_template_engine = 'jinja2'
 
 this_dir = os.path.dirname(__file__)
 grumpywidgets_template_dir = os.path.join(this_dir, 'templates')
+register_template_path(grumpywidgets_template_dir)
+
+# widget class -> (public attribute names, names of callable class attributes)
+_class_attribute_names = {}
+# widget class -> shared (frozen) widget instance, see "Widget.blueprint()"
+_blueprints = {}
+
+def _blueprint(klass):
+    return klass.blueprint()
+
+def class_attribute_names(klass):
+    """Return the public (non-callable) attribute names and the names of all
+    public callable attributes (methods) of the given widget class.
+
+    The result is cached per class ("dir()" is quite expensive), call
+    "invalidate_class_attribute_names()" after modifying a widget class."""
+    names = _class_attribute_names.get(klass)
+    if names is None:
+        attribute_names = set()
+        method_names = set()
+        for key in dir(klass):
+            if key.startswith('_'):
+                continue
+            if callable(getattr(klass, key)):
+                method_names.add(key)
+            else:
+                attribute_names.add(key)
+        names = (frozenset(attribute_names), frozenset(method_names))
+        _class_attribute_names[klass] = names
+    return names
+
+def invalidate_class_attribute_names():
+    """Discard the cached attribute names of all widget classes as well as
+    all blueprints. Call this after modifying widget classes at runtime (e.g.
+    adding new attributes to a class after it was used)."""
+    _class_attribute_names.clear()
+    _blueprints.clear()
+
+
+def _check_async_support():
+    if six.PY2:
+        raise RuntimeError('async rendering requires Python 3')
+
+def _is_immutable(value):
+    is_frozen = getattr(value, 'is_internal_state_frozen', None)
+    return (is_frozen is not None) and (is_frozen() is True)
+
 
 class Widget(object):
     name = None
     id = None
     template = None
     template_name = None
-    template_engine = 'jinja2'
+    # None: use the template engine of the parent widget (Jinja2 for widgets
+    # without parent), see ".resolved_template_engine()"
+    template_engine = None
     css_classes = None
     container_attrs = None
 
-    parent = None
-
     _template_path = grumpywidgets_template_dir
+    # frozen widgets (see ".blueprint()") must not be modified
+    _frozen = False
+    # containers with shared children (blueprints and bound widgets) render
+    # bound copies of their children instead of modifying them
+    _bind_children = False
+    # weak reference to the parent widget (see ".parent")
+    _parent_ref = None
 
     def __init__(self, **kwargs):
         self.context = None
         self._template = None
+        self._set_widget_attributes(kwargs)
+        if kwargs:
+            first_key = tuple(kwargs.keys())[0]
+            raise TypeError("__init__() got an unexpected keyword argument '%s'" % first_key)
+        if self.context is None:
+            # for more complex widgets '.new_context()' might depend on class
+            # attributes so let's call that method after initializing all
+            # instance variables.
+            self.context = self.new_context()
+
+    def _set_widget_attributes(self, kwargs):
+        """Set all known widget attributes from "kwargs" (and remove them from
+        "kwargs")."""
+        attribute_names, method_names = class_attribute_names(self.__class__)
         for key in tuple(kwargs.keys()):
             if key.startswith('_'):
                 raise ValueError("Must not override private attribute '%s'" % key)
-            if not hasattr(self, key):
-                continue
-            if callable(getattr(self, key)):
+            if key in method_names:
                 raise ValueError("Must not override instance method '%s()'" % key)
+            if (key not in attribute_names) and not hasattr(self, key):
+                continue
             value = kwargs.pop(key)
             if isinstance(value, list):
                 value = tuple(value)
@@ -52,24 +130,114 @@ class Widget(object):
                 # the actual attribute is likely a property without setter
                 # we can't detect that before...
                 pass
-        if kwargs:
-            first_key = tuple(kwargs.keys())[0]
-            raise TypeError("__init__() got an unexpected keyword argument '%s'" % first_key)
-        if self.context is None:
-            # for more complex widgets '.new_context()' might depend on class
-            # attributes so let's call that method after initializing all
-            # instance variables.
-            self.context = self.new_context()
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            raise AttributeError("can not modify frozen widget (attribute '%s')" % name)
+        super(Widget, self).__setattr__(name, value)
+
+    @classmethod
+    def blueprint(cls):
+        """Return a shared, frozen instance of this widget class which is built
+        only once (per process).
+
+        Use ".bind()" to get a widget for a single request:
+            form = ContactForm.blueprint().bind(context)"""
+        blueprint = _blueprints.get(cls)
+        if blueprint is None:
+            blueprint = cls()
+            blueprint._freeze()
+            _blueprints[cls] = blueprint
+        return blueprint
+
+    def _freeze(self):
+        children = self.__dict__.get('children')
+        if children is not None:
+            self.children = tuple(children)
+            for child in children:
+                child._freeze()
+        self._bind_children = True
+        self._frozen = True
+
+    def bind(self, context=None, **overrides):
+        """Return a lightweight copy of this widget which shares all
+        attributes (e.g. children, validators) with this widget but uses its
+        own context and the given attribute overrides.
+
+        Binding is cheap (no children are copied) so this is the preferred
+        way to use a shared widget (e.g. a blueprint) in a single request.
+        Containers render bound copies of their children so the shared
+        children are never modified."""
+        bound = self.__class__.__new__(self.__class__)
+        state = bound.__dict__
+        state.update(self.__dict__)
+        state.pop('_frozen', None)
+        state['_bind_children'] = True
+        if 'parent' in overrides:
+            # The parent never references a bound widget (containers bind
+            # their children while rendering) so a strong reference does not
+            # create a reference cycle. However it keeps temporary parents
+            # (e.g. the bound list field for a single row) alive.
+            state['_bound_parent'] = overrides['parent']
+        bound._set_widget_attributes(overrides)
+        if overrides:
+            first_key = tuple(overrides.keys())[0]
+            raise TypeError("bind() got an unexpected keyword argument '%s'" % first_key)
+        bound.context = context if (context is not None) else bound.new_context()
+        return bound
+
+    @property
+    def parent(self):
+        parent_ref = self._parent_ref
+        if parent_ref is None:
+            return None
+        return parent_ref()
+
+    @parent.setter
+    def parent(self, parent):
+        # Containers reference their children so the parent is only stored as
+        # weak reference. Otherwise every widget tree would contain reference
+        # cycles which can only be freed by the cyclic garbage collector.
+        self._parent_ref = weakref.ref(parent) if (parent is not None) else None
+
+    def __reduce_ex__(self, protocol):
+        if self._frozen and (_blueprints.get(self.__class__) is self):
+            # blueprints are pickled as reference to their class so they can
+            # be sent to other processes (validators are often not picklable)
+            return (_blueprint, (self.__class__, ))
+        return super(Widget, self).__reduce_ex__(protocol)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        parent_ref = state.pop('_parent_ref', None)
+        if parent_ref is not None:
+            state['_pickled_parent'] = parent_ref()
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        parent = state.pop('_pickled_parent', None)
+        self.__dict__.update(state)
+        if parent is not None:
+            self.__dict__['_parent_ref'] = weakref.ref(parent)
 
     def copy(self):
         klass = self.__class__
         attributes = self.widget_attributes()
         if 'parent' in attributes:
             del attributes['parent']
+        if self._template is None:
+            # derived from "template_name" and the (possibly inherited)
+            # template engine of the new parent
+            attributes.pop('template', None)
         for key in list(attributes):
             value = attributes[key]
             if not hasattr(value, 'copy'):
                 continue
+            elif _is_immutable(value):
+                # e.g. pycerberus validators: sharing them is safe and does not
+                # create new objects (validators contain reference cycles)
+                continue
             attributes[key] = value.copy()
         return klass(**attributes)
 
@@ -81,27 +249,55 @@ class Widget(object):
 
     def widget_attributes(self):
         attributes = dict()
-        for key in dir(self):
-            if key.startswith('_'):
-                continue
+        for key in self._attribute_names():
             value = getattr(self, key)
             if callable(value):
                 continue
             attributes[key] = value
         return attributes
 
+    def _attribute_names(self):
+        attribute_names = class_attribute_names(self.__class__)[0]
+        instance_names = [key for key in self.__dict__
+                          if (not key.startswith('_')) and (key not in attribute_names)]
+        if not instance_names:
+            return attribute_names
+        return attribute_names.union(instance_names)
+
     @property
     def template(self):
         if self._template is not None:
             return self._template
         elif self.template_name is not None:
-            return self.template_name + '.' + self.template_engine
+            return self.template_name + '.' + self.resolved_template_engine()
         return None
 
     @template.setter
     def template(self, value):
         self._template = value
 
+    def resolved_template_engine(self):
+        """Return the name of the template engine which renders this widget.
+
+        Widgets without an explicit "template_engine" use the engine of their
+        parent so a single setting selects the engine for a whole widget tree
+        (e.g. "Form(template_engine='native', children=...)") - as long as
+        that engine provides a template for the widget. Otherwise (e.g. for
+        custom widgets with a Jinja2 template only) and for widgets with a
+        custom template (source) Jinja2 is used unless specified otherwise."""
+        if self.template_engine is not None:
+            return self.template_engine
+        parent = self.parent
+        if (parent is None) or (self._template is not None) or (self.template_name is None):
+            return default_template_engine
+        engine_name = parent.resolved_template_engine()
+        if engine_name == default_template_engine:
+            return engine_name
+        engine = get_template_engine(engine_name)
+        if not engine.has_template(self.template_name + '.' + engine_name, self._template_path):
+            return default_template_engine
+        return engine_name
+
     def template_variables(self, value, **widget_attributes):
         template_values = self.widget_attributes()
         css_classes = template_values.get('css_classes')
@@ -141,29 +337,109 @@ class Widget(object):
         template_values.update({
             'h': template_helpers,
             'self_': self,
+            # containers render their children chunk by chunk
+            'child_stream': child_stream,
         })
         return template_values
 
     def _render_template(self, template_variables):
-        if self.template_engine == 'jinja2':
-            return render_jinja_template(self.template, template_variables, self._template_path)
-        elif self.template_engine == 'genshi':
-            return render_genshi_template(self.template, template_variables, self._template_path)
-        raise ValueError('unknown template engine %s' % self.template_engine)
+        engine = get_template_engine(self.resolved_template_engine())
+        return engine.render(self.template, template_variables, self._template_path)
 
     def _display_value(self, value):
         if value is not None:
             return value
         return self.context.value
 
+    def _stream_template(self, template_variables):
+        engine = get_template_engine(self.resolved_template_engine())
+        return engine.stream(self.template, template_variables, self._template_path)
+
+    def _display_variables(self, value=None, **kwargs):
+        if kwargs:
+            attribute_names = self._attribute_names()
+            for key in kwargs:
+                if (key not in attribute_names) or callable(getattr(self, key)):
+                    raise TypeError("display() got an unexpected keyword argument '%s'" % key)
+        return self.template_variables(value, **kwargs)
+
     def display(self, value=None, **kwargs):
-        unknown_parameters = set(kwargs).difference(set(self.widget_attributes()))
-        if unknown_parameters:
-            first = unknown_parameters.pop()
-            raise TypeError("display() got an unexpected keyword argument '%s'" % first)
-        variables = self.template_variables(value, **kwargs)
+        if self._frozen:
+            # rendering may modify the context (e.g. "value") which must
+            # never be shared between requests
+            return self.bind().display(value, **kwargs)
+        variables = self._display_variables(value, **kwargs)
         return self._render_template(variables)
 
+    def display_for(self, context, value=None, **kwargs):
+        """Render the widget with the given context without modifying this
+        widget (or its children) so a single widget instance can be rendered
+        by multiple threads at the same time.
+
+        The context is passed down explicitly to all children (see ".bind()")."""
+        return self.bind(context).display(value, **kwargs)
+
+    def display_stream_for(self, context, value=None, **kwargs):
+        """Thread-safe variant of ".display_stream()", see ".display_for()"."""
+        return self.bind(context).display_stream(value, **kwargs)
+
+    def display_stream(self, value=None, **kwargs):
+        """Return an iterator which yields the widget markup in chunks (text)
+        while it is rendered. Containers like forms render their children
+        chunk by chunk as well so the complete markup never needs to be kept
+        in memory (see ".display_bytes_stream()" for a WSGI response)."""
+        if overrides_display_only(self.__class__):
+            # keep custom ".display()" implementations working (also for
+            # children of containers)
+            return iter((six.text_type(self.display(value, **kwargs)), ))
+        if self._frozen:
+            return self.bind().display_stream(value, **kwargs)
+        variables = self._display_variables(value, **kwargs)
+        return self._stream_template(variables)
+
+    def display_bytes_stream(self, value=None, encoding='utf-8', **kwargs):
+        """Return an iterator which yields the encoded markup (bytes) in
+        chunks while it is rendered so it can be returned directly as WSGI
+        response body (PEP 3333 requires bytes)."""
+        chunks = self.display_stream(value, **kwargs)
+        return (six.text_type(chunk).encode(encoding) for chunk in chunks)
+
+    def display_async(self, value=None, **kwargs):
+        """Return an awaitable which renders the widget with asyncio
+        (Python 3.6+). Jinja2 templates are rendered in Jinja's async mode so
+        template helpers may return awaitables. Children of container widgets
+        are rendered via the same asyncio path."""
+        _check_async_support()
+        if self._frozen:
+            return self.bind().display_async(value, **kwargs)
+        engine = get_template_engine(self.resolved_template_engine())
+        variables = self._async_display_variables(value, **kwargs)
+        return render_template_async(engine, self.template, variables, self._template_path)
+
+    def display_stream_async(self, value=None, **kwargs):
+        """Asynchronous iterator variant of "display_stream()" (Python 3.6+)."""
+        _check_async_support()
+        if self._frozen:
+            return self.bind().display_stream_async(value, **kwargs)
+        engine = get_template_engine(self.resolved_template_engine())
+        variables = self._async_display_variables(value, **kwargs)
+        return stream_template_async(engine, self.template, variables, self._template_path)
+
+    def _async_display_variables(self, value=None, **kwargs):
+        variables = self._display_variables(value, **kwargs)
+        variables['child_stream'] = child_stream_async
+        return variables
+
+    def render_into(self, writer, value=None, **kwargs):
+        """Write the widget markup (text) chunk by chunk to "writer" which is
+        either an object with a "write()" method (e.g. io.StringIO) or a
+        callable (e.g. a function which encodes the text for a WSGI "write"
+        callable). Child widgets write into the same writer so no
+        intermediate strings are built for containers."""
+        write = getattr(writer, 'write', writer)
+        for chunk in self.display_stream(value, **kwargs):
+            write(chunk)
+
     def __html__(self):
         return self.display()
     __unicode__ = __html__
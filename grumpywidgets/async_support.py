@@ -0,0 +1,49 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+asyncio rendering for widgets (Python 3.6+ only), see
+"Widget.display_async()" and "Widget.display_stream_async()".
+"""
+
+import asyncio
+
+from .utils import overrides_display_only
+
+
+__all__ = [
+    'child_stream_async',
+    'render_template_async',
+    'stream_template_async',
+]
+
+async def render_template_async(engine, template, template_variables, template_path):
+    render_async = getattr(engine, 'render_async', None)
+    if render_async is not None:
+        return await render_async(template, template_variables, template_path)
+    chunks = []
+    async for chunk in stream_template_async(engine, template, template_variables, template_path):
+        chunks.append(chunk)
+    return u''.join(chunks)
+
+
+async def stream_template_async(engine, template, template_variables, template_path):
+    stream_async = getattr(engine, 'stream_async', None)
+    if stream_async is not None:
+        async for chunk in stream_async(template, template_variables, template_path):
+            yield chunk
+    else:
+        for chunk in engine.stream(template, template_variables, template_path):
+            yield chunk
+
+
+async def child_stream_async(child):
+    """Render a child widget (in a container template) via the asyncio path."""
+    if overrides_display_only(child.__class__):
+        yield str(child.display())
+    else:
+        async for chunk in child.display_stream_async():
+            yield chunk
+    # a big form might take some time to render so let other tasks run
+    # after each child
+    await asyncio.sleep(0)
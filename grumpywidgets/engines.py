@@ -0,0 +1,193 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from __future__ import absolute_import
+
+try:
+    from genshi.template import TemplateNotFound as GenshiTemplateNotFound
+except ImportError:
+    GenshiTemplateNotFound = None
+try:
+    from jinja2 import TemplateNotFound
+except ImportError:
+    TemplateNotFound = None
+import six
+
+from .genshi_support import (genshi_file_templates, genshi_loaders,
+    is_genshi_available, render_genshi_template, stream_genshi_template)
+from .jinja_support import (jinja_async_environments,
+    jinja_async_file_templates, jinja_environments, jinja_file_templates,
+    is_jinja2_available, render_jinja_template, render_jinja_template_async,
+    stream_jinja_template, stream_jinja_template_async)
+from .native_support import (has_native_template, render_native_template,
+    stream_native_template)
+# registers native templates for all widgets in grumpywidgets
+from . import native_templates
+
+
+__all__ = [
+    'get_template_engine',
+    'register_template_engine',
+    'template_engines',
+    'unregister_template_engine',
+    'GenshiEngine',
+    'JinjaEngine',
+    'NativeEngine',
+    'TemplateEngine',
+]
+
+class TemplateEngine(object):
+    """Renders widget templates. Widgets select their engine by name
+    ("Widget.template_engine"), see "register_template_engine()".
+
+    Template files for an engine use the engine name as file extension (e.g.
+    "label.jinja2")."""
+    is_available = True
+
+    def compile(self, template_name, template_path):
+        """Compile the template (if the engine supports that) so later calls
+        to ".render()" can use a cached template."""
+        pass
+
+    def render(self, template, template_variables, template_path):
+        raise NotImplementedError()
+
+    def stream(self, template, template_variables, template_path):
+        """Return an iterator of text chunks. Engines without streaming
+        support just return the complete markup as a single chunk."""
+        html = self.render(template, template_variables, template_path)
+        return iter((six.text_type(html), ))
+
+    def has_template(self, template_name, template_path):
+        """Return True if the engine provides the template "template_name"
+        (including the file extension) in "template_path". Widgets only use
+        the template engine of their parent if that engine provides their
+        template (see "Widget.resolved_template_engine()")."""
+        return False
+
+    # Engines with asyncio support (Python 3 only) also provide
+    #   - render_async(template, template_variables, template_path)
+    #     returning an awaitable (text)
+    #   - stream_async(template, template_variables, template_path)
+    #     returning an asynchronous iterator of text chunks
+    # Otherwise the synchronous methods are used for asyncio rendering.
+
+    def invalidate(self):
+        """Discard all cached templates."""
+        pass
+
+
+class JinjaEngine(TemplateEngine):
+    is_available = is_jinja2_available
+
+    def compile(self, template_name, template_path):
+        jinja_environments.get_template(template_name, template_path)
+
+    def has_template(self, template_name, template_path):
+        def find_template():
+            try:
+                self.compile(template_name, template_path)
+            except TemplateNotFound:
+                return False
+            return True
+        return _cached_lookup(self, template_name, template_path, find_template)
+
+    def render(self, template, template_variables, template_path):
+        return render_jinja_template(template, template_variables, template_path)
+
+    def stream(self, template, template_variables, template_path):
+        return stream_jinja_template(template, template_variables, template_path)
+
+    def render_async(self, template, template_variables, template_path):
+        return render_jinja_template_async(template, template_variables, template_path)
+
+    def stream_async(self, template, template_variables, template_path):
+        return stream_jinja_template_async(template, template_variables, template_path)
+
+    def invalidate(self):
+        _template_lookups.clear()
+        jinja_environments.invalidate()
+        jinja_file_templates.clear()
+        jinja_async_environments.invalidate()
+        jinja_async_file_templates.clear()
+
+
+class GenshiEngine(TemplateEngine):
+    is_available = is_genshi_available
+
+    def compile(self, template_name, template_path):
+        genshi_loaders.load(template_name, template_path)
+
+    def has_template(self, template_name, template_path):
+        def find_template():
+            try:
+                self.compile(template_name, template_path)
+            except GenshiTemplateNotFound:
+                return False
+            return True
+        return _cached_lookup(self, template_name, template_path, find_template)
+
+    def render(self, template, template_variables, template_path):
+        return render_genshi_template(template, template_variables, template_path)
+
+    def stream(self, template, template_variables, template_path):
+        return stream_genshi_template(template, template_variables, template_path)
+
+    def invalidate(self):
+        _template_lookups.clear()
+        genshi_loaders.invalidate()
+        genshi_file_templates.clear()
+
+
+class NativeEngine(TemplateEngine):
+    """Renders widgets with plain Python functions instead of templates,
+    see "grumpywidgets.native_support"."""
+    def has_template(self, template_name, template_path):
+        return has_native_template(template_name)
+
+    def render(self, template, template_variables, template_path):
+        return render_native_template(template, template_variables, template_path)
+
+    def stream(self, template, template_variables, template_path):
+        return stream_native_template(template, template_variables, template_path)
+
+
+# (engine, template name, template path) -> True if the template exists
+# (avoids file system access for missing templates)
+_template_lookups = {}
+
+def _cached_lookup(engine, template_name, template_path, find_template):
+    if not isinstance(template_path, six.string_types):
+        template_path = tuple(template_path)
+    key = (engine, template_name, template_path)
+    exists = _template_lookups.get(key)
+    if exists is None:
+        exists = engine.is_available and find_template()
+        _template_lookups[key] = exists
+    return exists
+
+
+_template_engines = {}
+
+def register_template_engine(name, engine):
+    """Make the template engine available for all widgets with
+    "template_engine=<name>". An existing engine with the same name is
+    replaced."""
+    _template_engines[name] = engine
+
+def unregister_template_engine(name):
+    _template_engines.pop(name, None)
+
+def get_template_engine(name):
+    engine = _template_engines.get(name)
+    if engine is None:
+        raise ValueError('unknown template engine %s' % name)
+    return engine
+
+def template_engines():
+    return dict(_template_engines)
+
+register_template_engine('jinja2', JinjaEngine())
+register_template_engine('genshi', GenshiEngine())
+register_template_engine('native', NativeEngine())
@@ -2,22 +2,140 @@
 # The source code contained in this file is licensed under the MIT license.
 # See LICENSE.txt in the main project directory, for more information.
 
+import threading
+
 try:
+    from genshi.core import Markup, TEXT
     from genshi.template import MarkupTemplate, TemplateLoader
     is_genshi_available = True
 except ImportError:
     is_genshi_available = False
+import six
+
+from .template_cache import FileTemplateCache
+from .utils import overrides_display_only
+
+
+__all__ = [
+    'genshi_child_stream',
+    'genshi_file_templates',
+    'genshi_loaders',
+    'render_genshi_template',
+    'stream_genshi_template',
+    'GenshiLoaderRegistry',
+]
+
+class GenshiLoaderRegistry(object):
+    """Process-wide registry of Genshi template loaders (one per template
+    path).
+
+    Genshi's TemplateLoader caches parsed templates (and is thread-safe) so
+    sharing loaders means every template is parsed only once. Keep
+    "auto_reload" disabled in production to avoid checking the file
+    modification time for every template lookup.
+
+    "hits" and "misses" count template lookups which were served from a
+    loader cache and those which had to parse a template file."""
+    def __init__(self, max_cache_size=100, auto_reload=False):
+        self.max_cache_size = max_cache_size
+        self.auto_reload = auto_reload
+        self.hits = 0
+        self.misses = 0
+        self._loaders = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **settings):
+        """Change the registry settings ("max_cache_size", "auto_reload").
+        All existing loaders are discarded."""
+        for key, value in settings.items():
+            if key.startswith('_') or key in ('hits', 'misses') or not hasattr(self, key):
+                raise TypeError("configure() got an unexpected keyword argument '%s'" % key)
+            setattr(self, key, value)
+        self.invalidate()
+
+    def loader(self, template_path):
+        key = self._key(template_path)
+        loader = self._loaders.get(key)
+        if loader is not None:
+            return loader
+        with self._lock:
+            loader = self._loaders.get(key)
+            if loader is None:
+                loader = TemplateLoader(
+                    key,
+                    auto_reload=self.auto_reload,
+                    max_cache_size=self.max_cache_size,
+                    callback=self._template_loaded,
+                )
+                self._loaders[key] = loader
+        return loader
 
+    def load(self, template_name, template_path):
+        misses = self.misses
+        template = self.loader(template_path).load(template_name)
+        with self._lock:
+            # "misses" was incremented by the loader callback if the template
+            # had to be parsed (a concurrent miss might be counted as hit but
+            # these numbers are meant as a rough indicator anyway).
+            if self.misses == misses:
+                self.hits += 1
+        return template
 
-__all__ = ['render_genshi_template']
+    def invalidate(self, template_path=None):
+        """Drop cached loaders (and all their parsed templates).
+
+        If "template_path" is given only the loader for that path is
+        discarded."""
+        with self._lock:
+            if template_path is None:
+                self._loaders.clear()
+            else:
+                self._loaders.pop(self._key(template_path), None)
+
+    def reset_statistics(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _key(self, template_path):
+        if isinstance(template_path, six.string_types):
+            return (template_path, )
+        return tuple(template_path)
+
+    def _template_loaded(self, template):
+        with self._lock:
+            self.misses += 1
+
+genshi_loaders = GenshiLoaderRegistry()
+genshi_file_templates = FileTemplateCache(lambda source: MarkupTemplate(source))
+
+
+def genshi_child_stream(child):
+    """Return a Genshi event stream for the markup of "child" (used as
+    "${child_stream(child)}" in Genshi templates).
+
+    The events of Genshi children are generated while the parent template is
+    serialized so containers (e.g. a form with a large list field) are
+    streamed completely. Children with other template engines are rendered
+    chunk by chunk (as markup text)."""
+    if overrides_display_only(child.__class__):
+        return Markup(six.text_type(child.display()))
+    if child.resolved_template_engine() == 'genshi':
+        return child.display()
+    position = (None, -1, -1)
+    return ((TEXT, Markup(chunk), position) for chunk in child.display_stream())
 
 def render_genshi_template(template, template_variables, template_path):
     if not is_genshi_available:
         raise ValueError('Genshi not available')
+    template_variables['child_stream'] = genshi_child_stream
     if hasattr(template, 'read'):
-        template_ = MarkupTemplate(template.read())
-        template.seek(0)
+        template_ = genshi_file_templates.get_template(template)
     else:
-        loader = TemplateLoader((template_path,))
-        template_ = loader.load(template)
+        template_ = genshi_loaders.load(template, template_path)
     return template_.generate(**template_variables)
+
+def stream_genshi_template(template, template_variables, template_path):
+    stream = render_genshi_template(template, template_variables, template_path)
+    # same serialization as "six.text_type(stream)"
+    return stream.serialize(method=stream.serializer or 'xml')
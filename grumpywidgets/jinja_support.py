@@ -2,27 +2,225 @@
 # The source code contained in this file is licensed under the MIT license.
 # See LICENSE.txt in the main project directory, for more information.
 
+from collections import OrderedDict
+import os
+import tempfile
+import threading
+
 try:
     from jinja2 import Environment, PackageLoader, Template
+    from jinja2.bccache import FileSystemBytecodeCache
     from jinja2.loaders import FileSystemLoader
     is_jinja2_available = True
 except ImportError:
+    FileSystemBytecodeCache = object
     is_jinja2_available = False
 import six
 
-__all__ = ['render_jinja_template']
+from .template_cache import FileTemplateCache
 
-def render_jinja_template(template, template_variables, template_path):
-    if not is_jinja2_available:
-        raise ValueError('Jinja2 not available')
-    if hasattr(template, 'read'):
-        template_ = Template(template.read())
-        template.seek(0)
-    else:
+__all__ = [
+    'jinja_async_environments',
+    'jinja_async_file_templates',
+    'jinja_environments',
+    'jinja_file_templates',
+    'render_jinja_template',
+    'render_jinja_template_async',
+    'stream_jinja_template',
+    'stream_jinja_template_async',
+    'AtomicFileSystemBytecodeCache',
+    'JinjaEnvironmentRegistry',
+]
+
+class AtomicFileSystemBytecodeCache(FileSystemBytecodeCache):
+    """Jinja2 bytecode cache which can be shared by multiple processes.
+
+    Bytecode is written to a temporary file first which is then renamed so
+    concurrent readers never see partially written cache files (older Jinja2
+    versions write the cache file in place)."""
+    def dump_bytecode(self, bucket):
+        filename = os.path.join(self.directory, self.pattern % bucket.key)
+        fd, tmp_filename = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                bucket.write_bytecode(fp)
+            _rename(tmp_filename, filename)
+        except (IOError, OSError):
+            # caching is an optimization only, another process might have won
+            # the race (Windows does not allow renaming to existing files).
+            try:
+                os.remove(tmp_filename)
+            except OSError:
+                pass
+
+
+def _rename(source, target):
+    replace = getattr(os, 'replace', None)
+    if replace is None:
+        # Python 2: os.rename() overwrites existing files on POSIX
+        replace = os.rename
+    replace(source, target)
+
+
+class JinjaEnvironmentRegistry(object):
+    """Process-wide registry of Jinja2 environments (one per template path).
+
+    Every environment keeps Jinja's cache of compiled templates so rendering
+    the same widget template again neither touches the file system nor the
+    Jinja compiler (as long as "auto_reload" is disabled).
+
+    "cache_size" limits the number of compiled templates per environment,
+    "max_environments" limits the number of environments (the oldest
+    environment is dropped first).
+
+    If "bytecode_cache_dir" is set compiled templates are also stored on
+    disk so other processes (e.g. freshly started workers) can load them
+    without invoking the Jinja compiler.
+
+    Environments with "enable_async" compile templates for asyncio rendering
+    (Python 3 only).
+
+    A registry created with "base" uses the settings of the base registry
+    (e.g. "jinja_async_environments" uses the settings of
+    "jinja_environments"). Calling "configure()" on either of them changes
+    both registries."""
+    def __init__(self, cache_size=400, max_environments=50, auto_reload=False,
+                 bytecode_cache_dir=None, enable_async=False, base=None):
+        self.cache_size = cache_size
+        self.max_environments = max_environments
+        self.auto_reload = auto_reload
+        self.bytecode_cache_dir = bytecode_cache_dir
+        self.enable_async = enable_async
+        self._base = base
+        self._derived = []
+        self._bytecode_cache = None
+        self._environments = OrderedDict()
+        self._lock = threading.Lock()
+        if base is not None:
+            base._derived.append(self)
+            self._apply_settings(base._settings())
+
+    def configure(self, **settings):
+        """Change the registry settings ("cache_size", "max_environments",
+        "auto_reload", "bytecode_cache_dir"). All existing environments are
+        discarded."""
+        if self._base is not None:
+            return self._base.configure(**settings)
+        for key in settings:
+            if key.startswith('_') or key == 'enable_async' or not hasattr(self, key):
+                raise TypeError("configure() got an unexpected keyword argument '%s'" % key)
+        for registry in [self] + self._derived:
+            registry._apply_settings(settings)
+
+    def _settings(self):
+        return dict(
+            cache_size=self.cache_size,
+            max_environments=self.max_environments,
+            auto_reload=self.auto_reload,
+            bytecode_cache_dir=self.bytecode_cache_dir,
+        )
+
+    def _apply_settings(self, settings):
+        for key, value in settings.items():
+            setattr(self, key, value)
+        self._bytecode_cache = None
+        self.invalidate()
+
+    def environment(self, template_path):
+        key = self._key(template_path)
+        env = self._environments.get(key)
+        if env is not None:
+            return env
+        with self._lock:
+            env = self._environments.get(key)
+            if env is None:
+                env = self._build_environment(template_path)
+                self._environments[key] = env
+                while len(self._environments) > self.max_environments:
+                    self._environments.popitem(last=False)
+        return env
+
+    def get_template(self, template_name, template_path):
+        return self.environment(template_path).get_template(template_name)
+
+    def invalidate(self, template_path=None):
+        """Drop cached environments (and all their compiled templates).
+
+        If "template_path" is given only the environment for that path is
+        discarded."""
+        with self._lock:
+            if template_path is None:
+                self._environments.clear()
+            else:
+                self._environments.pop(self._key(template_path), None)
+
+    def _key(self, template_path):
+        if isinstance(template_path, six.string_types):
+            return ('filesystem', template_path)
+        return ('package', ) + tuple(template_path)
+
+    def _build_environment(self, template_path):
         if isinstance(template_path, six.string_types):
             loader = FileSystemLoader(template_path)
         else:
             loader = PackageLoader(*template_path)
-        env = Environment(loader=loader)
-        template_ = env.get_template(template)
+        return Environment(
+            loader=loader,
+            cache_size=self.cache_size,
+            auto_reload=self.auto_reload,
+            bytecode_cache=self.bytecode_cache(),
+            enable_async=self.enable_async,
+        )
+
+    def bytecode_cache(self):
+        if self.bytecode_cache_dir is None:
+            return None
+        if self._bytecode_cache is None:
+            if not os.path.isdir(self.bytecode_cache_dir):
+                try:
+                    os.makedirs(self.bytecode_cache_dir)
+                except OSError:
+                    # directory created concurrently by another process
+                    if not os.path.isdir(self.bytecode_cache_dir):
+                        raise
+            # Jinja only checks the template source when loading bytecode so
+            # async templates need their own cache files.
+            pattern = '__jinja2_async_%s.cache' if self.enable_async else '__jinja2_%s.cache'
+            self._bytecode_cache = AtomicFileSystemBytecodeCache(
+                self.bytecode_cache_dir, pattern=pattern)
+        return self._bytecode_cache
+
+jinja_environments = JinjaEnvironmentRegistry()
+jinja_file_templates = FileTemplateCache(lambda source: Template(source))
+jinja_async_environments = JinjaEnvironmentRegistry(enable_async=True,
+    base=jinja_environments)
+jinja_async_file_templates = FileTemplateCache(
+    lambda source: Template(source, enable_async=True))
+
+
+def _load_jinja_template(template, template_path, is_async=False):
+    if not is_jinja2_available:
+        raise ValueError('Jinja2 not available')
+    if is_async:
+        environments, file_templates = jinja_async_environments, jinja_async_file_templates
+    else:
+        environments, file_templates = jinja_environments, jinja_file_templates
+    if hasattr(template, 'read'):
+        return file_templates.get_template(template)
+    return environments.get_template(template, template_path)
+
+def render_jinja_template(template, template_variables, template_path):
+    template_ = _load_jinja_template(template, template_path)
     return template_.render(**template_variables)
+
+def stream_jinja_template(template, template_variables, template_path):
+    template_ = _load_jinja_template(template, template_path)
+    return template_.generate(**template_variables)
+
+def render_jinja_template_async(template, template_variables, template_path):
+    template_ = _load_jinja_template(template, template_path, is_async=True)
+    return template_.render_async(**template_variables)
+
+def stream_jinja_template_async(template, template_variables, template_path):
+    template_ = _load_jinja_template(template, template_path, is_async=True)
+    return template_.generate_async(**template_variables)
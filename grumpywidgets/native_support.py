@@ -0,0 +1,76 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+"native" templates are plain Python functions which build the HTML for a
+widget directly (without any template engine). Each function receives the
+template variables (as dict) and must return the same markup as the Jinja2
+template for that widget.
+"""
+
+import six
+
+
+__all__ = [
+    'has_native_template',
+    'native_attr',
+    'native_templates',
+    'register_native_template',
+    'render_native_template',
+    'stream_native_template',
+]
+
+_native_templates = {}
+
+_native_stream_templates = {}
+
+def register_native_template(template_name, render_function, stream_function=None):
+    """Register a native template for widgets with "template_name" (without
+    file extension).
+
+    "stream_function" (optional) returns an iterator of markup chunks and is
+    used by "Widget.display_stream()"."""
+    _native_templates[template_name] = render_function
+    if stream_function is not None:
+        _native_stream_templates[template_name] = stream_function
+    else:
+        _native_stream_templates.pop(template_name, None)
+
+def native_templates():
+    return dict(_native_templates)
+
+def has_native_template(template_name):
+    """Return True if a native template is registered for "template_name"
+    (with or without ".native" extension)."""
+    if template_name.endswith('.native'):
+        template_name = template_name[:-len('.native')]
+    return template_name in _native_templates
+
+def _template_name(template):
+    if hasattr(template, 'read'):
+        raise ValueError('native templates can not be loaded from files')
+    template_name = template
+    if template_name.endswith('.native'):
+        template_name = template_name[:-len('.native')]
+    if template_name not in _native_templates:
+        raise ValueError('unknown native template %s' % template_name)
+    return template_name
+
+def render_native_template(template, template_variables, template_path):
+    render_function = _native_templates[_template_name(template)]
+    return render_function(template_variables)
+
+def stream_native_template(template, template_variables, template_path):
+    template_name = _template_name(template)
+    stream_function = _native_stream_templates.get(template_name)
+    if stream_function is None:
+        return iter((_native_templates[template_name](template_variables), ))
+    return stream_function(template_variables)
+
+
+def native_attr(name, value):
+    """Return ' name="value"' if "value" is true-ish (equivalent to
+    '{%- if value %} name="{{ value }}"{% endif %}' in Jinja2)."""
+    if not value:
+        return u''
+    return u' %s="%s"' % (name, six.text_type(value))
@@ -0,0 +1,30 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+Native templates (see "grumpywidgets.native_support") for all widgets in
+grumpywidgets. Each function mirrors the Jinja2 template with the same name.
+"""
+
+from __future__ import absolute_import
+
+import six
+
+from .native_support import native_attr, register_native_template
+
+
+__all__ = ['render_label']
+
+def render_label(v):
+    value = v.get('value')
+    return u''.join((
+        u'<label',
+        native_attr('id', v.get('id')),
+        native_attr('for', v.get('for_')),
+        native_attr('class', v.get('css_classes')),
+        u'>',
+        six.text_type(value) if value else u'',
+        u'</label>',
+    ))
+
+register_native_template('label', render_label)
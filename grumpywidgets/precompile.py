@@ -0,0 +1,126 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+"""
+Compile all widget templates before a worker process accepts requests.
+
+    python -m grumpywidgets.precompile [--path DIR] [--bytecode-cache DIR]
+                                       [--widget module:Class]
+
+Templates from all registered template paths (see
+"grumpywidgets.template_cache.register_template_path") are compiled into the
+render caches. Widget classes (e.g. forms) can be warmed up by rendering them
+once with an empty context.
+"""
+
+from __future__ import absolute_import, print_function
+
+import argparse
+from collections import namedtuple
+import importlib
+import os
+import sys
+import time
+
+import six
+
+from grumpywidgets.engines import template_engines
+from grumpywidgets.jinja_support import jinja_environments
+from grumpywidgets.template_cache import template_paths
+
+
+__all__ = ['precompile_templates', 'warm_up_widget', 'CompiledTemplate']
+
+timer = getattr(time, 'perf_counter', time.time)
+
+CompiledTemplate = namedtuple('CompiledTemplate',
+    ('template_path', 'template_name', 'template_engine', 'duration'))
+
+def precompile_templates(paths=None):
+    """Compile all templates in the given template paths (default: all
+    registered template paths) and return a list of CompiledTemplate items
+    (including the compile time in seconds).
+
+    The file extension selects the template engine (e.g. ".jinja2"), files
+    for unknown/unavailable engines are skipped."""
+    if paths is None:
+        paths = template_paths()
+    engines = template_engines()
+    compiled = []
+    for template_path in paths:
+        for template_name in _template_names(template_path):
+            engine_name = template_name.rsplit('.', 1)[-1]
+            engine = engines.get(engine_name)
+            if (engine is None) or (not engine.is_available):
+                continue
+            start = timer()
+            engine.compile(template_name, template_path)
+            duration = timer() - start
+            compiled.append(CompiledTemplate(template_path, template_name, engine_name, duration))
+    return compiled
+
+
+def _template_names(template_path):
+    if not isinstance(template_path, six.string_types):
+        # (package_name, package_path) as used for Jinja2's PackageLoader
+        env = jinja_environments.environment(template_path)
+        return env.list_templates(extensions=['jinja2'])
+    names = []
+    for dirpath, dirnames, filenames in os.walk(template_path):
+        relative_dir = os.path.relpath(dirpath, template_path)
+        for filename in filenames:
+            if relative_dir != os.curdir:
+                filename = '/'.join(relative_dir.split(os.sep) + [filename])
+            names.append(filename)
+    return sorted(names)
+
+
+def warm_up_widget(widget):
+    """Render the widget (class or instance) once with an empty context so
+    all templates used by the widget and its children are compiled. Returns
+    the rendering time in seconds."""
+    if isinstance(widget, type):
+        widget = widget()
+    start = timer()
+    six.text_type(widget.display())
+    return timer() - start
+
+
+def _load_symbol(spec):
+    module_name, symbol_name = spec.split(':', 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, symbol_name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m grumpywidgets.precompile',
+        description='compile all widget templates')
+    parser.add_argument('--path', dest='paths', action='append', default=[],
+        help='additional template directory')
+    parser.add_argument('--bytecode-cache', dest='bytecode_cache_dir',
+        help='store compiled Jinja2 templates in this directory')
+    parser.add_argument('--widget', dest='widgets', action='append', default=[],
+        help='render widget class once ("module:Class")')
+    options = parser.parse_args(argv)
+
+    try:
+        # registers the template path for all form widgets
+        import grumpyforms.api
+    except ImportError:
+        pass
+    if options.bytecode_cache_dir:
+        jinja_environments.configure(bytecode_cache_dir=options.bytecode_cache_dir)
+    widgets = [_load_symbol(spec) for spec in options.widgets]
+
+    paths = template_paths() + tuple(options.paths)
+    for item in precompile_templates(paths):
+        template = os.path.join(six.text_type(item.template_path), item.template_name)
+        print('%8.2f ms  %s' % (item.duration * 1000, template))
+    for spec, widget in zip(options.widgets, widgets):
+        duration = warm_up_widget(widget)
+        print('%8.2f ms  %s' % (duration * 1000, spec))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
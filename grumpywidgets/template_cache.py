@@ -0,0 +1,95 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+import hashlib
+import threading
+from weakref import WeakKeyDictionary
+
+import six
+
+from .utils import LRUCache
+
+
+__all__ = ['register_template_path', 'template_paths', 'FileTemplateCache']
+
+_template_paths = []
+
+def register_template_path(template_path):
+    """Register a template path so its templates are included when warming
+    up the template caches (see "grumpywidgets.precompile")."""
+    if template_path not in _template_paths:
+        _template_paths.append(template_path)
+
+def template_paths():
+    return tuple(_template_paths)
+
+
+class FileTemplateCache(object):
+    """Cache for templates compiled from file-like objects (e.g.
+    "Widget(template=StringIO(...))").
+
+    Compiled templates are looked up by a hash of the template source so
+    custom templates are compiled only once even if every widget instance
+    uses its own file-like object. With "use_identity" the cache also
+    remembers the file-like object itself so later renderings do not even
+    need to read the template source (only use that if these objects are
+    never modified after their first rendering)."""
+    def __init__(self, compile_template, max_size=100, use_identity=False):
+        self.compile_template = compile_template
+        self.use_identity = use_identity
+        self._templates = LRUCache(max_size)
+        self._templates_by_identity = WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        return self._templates.max_size
+
+    @max_size.setter
+    def max_size(self, value):
+        self._templates.max_size = value
+
+    def get_template(self, fp):
+        if self.use_identity:
+            template = self._lookup_by_identity(fp)
+            if template is not None:
+                return template
+        source = fp.read()
+        fp.seek(0)
+        key = self._hash(source)
+        template = self._templates.get(key)
+        if template is None:
+            template = self.compile_template(source)
+            self._templates[key] = template
+        if self.use_identity:
+            self._remember_identity(fp, template)
+        return template
+
+    def clear(self):
+        self._templates.clear()
+        with self._lock:
+            self._templates_by_identity.clear()
+
+    def __len__(self):
+        return len(self._templates)
+
+    def _hash(self, source):
+        if isinstance(source, six.text_type):
+            source = source.encode('utf8')
+        return hashlib.sha1(source).hexdigest()
+
+    def _lookup_by_identity(self, fp):
+        with self._lock:
+            try:
+                return self._templates_by_identity.get(fp)
+            except TypeError:
+                # object does not support weak references
+                return None
+
+    def _remember_identity(self, fp, template):
+        with self._lock:
+            try:
+                self._templates_by_identity[fp] = template
+            except TypeError:
+                pass
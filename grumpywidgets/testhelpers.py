@@ -2,18 +2,25 @@
 # The source code contained in this file is licensed under the MIT license.
 # See LICENSE.txt in the main project directory, for more information.
 
+import os
 import re
 from xml.etree import ElementTree
 
 from htmlcompare import assert_same_html as assert_same_html_
+import six
+if not six.PY2:
+    import asyncio
 
 
 __all__ = [
     'as_normalized_html',
     'assert_same_html',
+    'collect_async',
     'flatten_stream',
     'reconfigure_widget',
     'template_widget',
+    'use_event_loop',
+    'write_template',
 ]
 
 def assert_same_html(expected, actual, message=None):
@@ -74,3 +81,33 @@ def template_widget(widget, template_engine, kwargs=None):
         return kwargs
     kwargs['template_engine'] = template_engine
     return widget(**kwargs)
+
+
+def write_template(template_dir, name, content):
+    """Write "content" (text) as UTF-8 encoded template "name" (which may
+    contain slashes for existing sub directories) into "template_dir"."""
+    with open(os.path.join(template_dir, *name.split('/')), 'wb') as fp:
+        fp.write(content.encode('utf8'))
+
+def use_event_loop(testcase):
+    """Return a new asyncio event loop (Python 3 only) which is the current
+    event loop until "testcase" finished (the loop is closed afterwards)."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    def close_loop():
+        asyncio.set_event_loop(None)
+        loop.close()
+    testcase.addCleanup(close_loop)
+    return loop
+
+def collect_async(loop, async_iterator):
+    """Return a list with all items of the asynchronous iterator (using
+    "loop" to run the iterator)."""
+    items = []
+    async_iterator = async_iterator.__aiter__()
+    while True:
+        try:
+            item = loop.run_until_complete(async_iterator.__anext__())
+        except StopAsyncIteration:
+            return items
+        items.append(item)
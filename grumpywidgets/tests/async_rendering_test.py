@@ -0,0 +1,55 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from io import StringIO
+from unittest import skipIf
+
+from pythonic_testcase import *
+import six
+
+from grumpywidgets.api import Widget
+from grumpywidgets.testhelpers import collect_async, use_event_loop
+if not six.PY2:
+    import asyncio
+
+
+@skipIf(six.PY2, 'asyncio rendering requires Python 3')
+class AsyncRenderingTest(PythonicTestCase):
+    def setUp(self):
+        self.loop = use_event_loop(self)
+
+    def test_can_render_jinja_template(self):
+        widget = Widget(template=StringIO(u'Hello {{ value }}!'))
+        assert_equals(u'Hello world!', self.loop.run_until_complete(widget.display_async('world')))
+
+    def test_can_use_awaitable_template_helpers(self):
+        widget = Widget(template=StringIO(u'Hello {{ self_.greet() }}!'))
+        widget.greet = lambda: asyncio.sleep(0, result=u'async world')
+        assert_equals(u'Hello async world!', self.loop.run_until_complete(widget.display_async()))
+
+    def test_can_render_genshi_template(self):
+        tmpl_str = u'<p xmlns:py="http://genshi.edgewall.org/">Hello ${value}!</p>'
+        widget = Widget(template=StringIO(tmpl_str), template_engine='genshi')
+        assert_equals(six.text_type(widget.display('world')),
+                      self.loop.run_until_complete(widget.display_async('world')))
+
+    def test_can_stream_template(self):
+        widget = Widget(template=StringIO(u'Hello {{ value }}!'))
+        chunks = collect_async(self.loop, widget.display_stream_async('world'))
+        assert_equals(u'Hello world!', u''.join(chunks))
+
+    def test_checks_display_parameters(self):
+        widget = Widget(template=StringIO(u'{{ value }}'))
+        e = assert_raises(TypeError, lambda: widget.display_async(invalid='bar'))
+        assert_equals("display() got an unexpected keyword argument 'invalid'",
+                      e.args[0])
+
+
+@skipIf(not six.PY2, 'only relevant for Python 2')
+class AsyncRenderingPython2Test(PythonicTestCase):
+    def test_raises_error_for_async_rendering(self):
+        widget = Widget(template=StringIO(u'{{ value }}'))
+        e = assert_raises(RuntimeError, lambda: widget.display_async())
+        assert_equals('async rendering requires Python 3', e.args[0])
+        assert_raises(RuntimeError, lambda: widget.display_stream_async())
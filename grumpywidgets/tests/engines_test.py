@@ -0,0 +1,39 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from pythonic_testcase import *
+
+from grumpywidgets.api import Widget
+from grumpywidgets.engines import (get_template_engine,
+    register_template_engine, template_engines, unregister_template_engine,
+    JinjaEngine, TemplateEngine)
+
+
+class UppercaseEngine(TemplateEngine):
+    def render(self, template, template_variables, template_path):
+        return template_variables['value'].upper()
+
+
+class TemplateEnginesTest(PythonicTestCase):
+    def tearDown(self):
+        unregister_template_engine('uppercase')
+
+    def test_provides_builtin_engines(self):
+        engines = template_engines()
+        assert_contains('jinja2', engines)
+        assert_contains('genshi', engines)
+        assert_isinstance(get_template_engine('jinja2'), JinjaEngine)
+
+    def test_can_register_custom_engine(self):
+        register_template_engine('uppercase', UppercaseEngine())
+        widget = Widget(template_name='foo', template_engine='uppercase')
+        assert_equals('FOO', widget.display('foo'))
+
+        unregister_template_engine('uppercase')
+        assert_not_contains('uppercase', template_engines())
+
+    def test_raises_error_for_unknown_engine(self):
+        widget = Widget(template_name='foo', template_engine='invalid')
+        e = assert_raises(ValueError, lambda: widget.display('foo'))
+        assert_equals('unknown template engine invalid', e.args[0])
@@ -0,0 +1,58 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+import shutil
+import tempfile
+
+from pythonic_testcase import *
+
+from grumpywidgets.genshi_support import (render_genshi_template,
+    GenshiLoaderRegistry)
+from grumpywidgets.testhelpers import assert_same_html, write_template
+
+
+class GenshiLoaderRegistryTest(PythonicTestCase):
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        self.registry = GenshiLoaderRegistry()
+        write_template(self.template_dir, 'hello.genshi',
+            u'<p xmlns:py="http://genshi.edgewall.org/">Hello ${value}!</p>')
+
+    def tearDown(self):
+        shutil.rmtree(self.template_dir)
+
+    def test_reuses_loader_for_same_template_path(self):
+        loader = self.registry.loader(self.template_dir)
+        assert_equals(loader, self.registry.loader(self.template_dir))
+        assert_false(loader.auto_reload)
+
+    def test_counts_cache_hits_and_misses(self):
+        template = self.registry.load('hello.genshi', self.template_dir)
+        assert_equals((0, 1), (self.registry.hits, self.registry.misses))
+
+        assert_true(template is self.registry.load('hello.genshi', self.template_dir))
+        assert_equals((1, 1), (self.registry.hits, self.registry.misses))
+
+        self.registry.reset_statistics()
+        assert_equals((0, 0), (self.registry.hits, self.registry.misses))
+
+    def test_can_invalidate_loaders(self):
+        template = self.registry.load('hello.genshi', self.template_dir)
+        self.registry.invalidate(self.template_dir)
+        assert_not_equals(template, self.registry.load('hello.genshi', self.template_dir))
+        assert_equals(2, self.registry.misses)
+
+    def test_can_configure_registry(self):
+        loader = self.registry.loader(self.template_dir)
+        self.registry.configure(max_cache_size=5, auto_reload=True)
+
+        new_loader = self.registry.loader(self.template_dir)
+        assert_not_equals(loader, new_loader)
+        assert_true(new_loader.auto_reload)
+        e = assert_raises(TypeError, lambda: self.registry.configure(hits=3))
+        assert_equals("configure() got an unexpected keyword argument 'hits'", e.args[0])
+
+    def test_can_render_templates_from_template_path(self):
+        stream = render_genshi_template('hello.genshi', {'value': 'world'}, self.template_dir)
+        assert_same_html(u'<p>Hello world!</p>', stream)
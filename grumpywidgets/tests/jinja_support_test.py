@@ -0,0 +1,111 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+import os
+import shutil
+import tempfile
+from unittest import skipIf
+
+from pythonic_testcase import *
+import six
+
+from grumpywidgets.jinja_support import (render_jinja_template,
+    JinjaEnvironmentRegistry)
+from grumpywidgets.testhelpers import write_template
+
+
+class JinjaEnvironmentRegistryTest(PythonicTestCase):
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        self.registry = JinjaEnvironmentRegistry()
+
+    def tearDown(self):
+        shutil.rmtree(self.template_dir)
+
+    def test_reuses_environment_for_same_template_path(self):
+        env = self.registry.environment(self.template_dir)
+        assert_equals(env, self.registry.environment(self.template_dir))
+        assert_not_equals(env, self.registry.environment(tempfile.gettempdir()))
+
+    def test_reuses_compiled_templates(self):
+        write_template(self.template_dir, 'hello.jinja2', u'Hello {{ value }}!')
+        template = self.registry.get_template('hello.jinja2', self.template_dir)
+        assert_equals(u'Hello world!', template.render(value='world'))
+
+        # no auto reload by default so the file system is not checked again
+        os.remove(os.path.join(self.template_dir, 'hello.jinja2'))
+        assert_true(template is self.registry.get_template('hello.jinja2', self.template_dir))
+
+    def test_can_invalidate_environments(self):
+        write_template(self.template_dir, 'hello.jinja2', u'Hello')
+        env = self.registry.environment(self.template_dir)
+        template = self.registry.get_template('hello.jinja2', self.template_dir)
+
+        write_template(self.template_dir, 'hello.jinja2', u'Goodbye')
+        self.registry.invalidate(self.template_dir)
+        assert_not_equals(env, self.registry.environment(self.template_dir))
+        new_template = self.registry.get_template('hello.jinja2', self.template_dir)
+        assert_equals(u'Goodbye', new_template.render())
+
+        self.registry.invalidate()
+        assert_not_equals(template, self.registry.get_template('hello.jinja2', self.template_dir))
+
+    def test_limits_number_of_environments(self):
+        registry = JinjaEnvironmentRegistry(max_environments=1)
+        env = registry.environment(self.template_dir)
+        registry.environment(tempfile.gettempdir())
+        assert_not_equals(env, registry.environment(self.template_dir))
+
+    def test_can_configure_registry(self):
+        env = self.registry.environment(self.template_dir)
+        self.registry.configure(cache_size=10, auto_reload=True)
+
+        new_env = self.registry.environment(self.template_dir)
+        assert_not_equals(env, new_env)
+        assert_true(new_env.auto_reload)
+        e = assert_raises(TypeError, lambda: self.registry.configure(invalid=True))
+        assert_equals("configure() got an unexpected keyword argument 'invalid'", e.args[0])
+
+    def test_can_store_bytecode_on_disk(self):
+        cache_dir = os.path.join(self.template_dir, 'cache')
+        write_template(self.template_dir, 'hello.jinja2', u'Hello {{ value }}!')
+        registry = JinjaEnvironmentRegistry(bytecode_cache_dir=cache_dir)
+        registry.get_template('hello.jinja2', self.template_dir)
+        assert_length(1, os.listdir(cache_dir))
+
+        # e.g. a new worker process
+        cold_registry = JinjaEnvironmentRegistry(bytecode_cache_dir=cache_dir)
+        env = cold_registry.environment(self.template_dir)
+        def fail_compile(*args, **kwargs):
+            raise AssertionError('template should be loaded from bytecode cache')
+        env.compile = fail_compile
+        template = cold_registry.get_template('hello.jinja2', self.template_dir)
+        assert_equals(u'Hello world!', template.render(value='world'))
+
+    @skipIf(six.PY2, 'async templates require Python 3')
+    def test_derived_registry_uses_settings_of_base_registry(self):
+        cache_dir = os.path.join(self.template_dir, 'cache')
+        write_template(self.template_dir, 'hello.jinja2', u'Hello {{ value }}!')
+        async_registry = JinjaEnvironmentRegistry(enable_async=True, base=self.registry)
+        env = async_registry.environment(self.template_dir)
+
+        self.registry.configure(bytecode_cache_dir=cache_dir, auto_reload=True)
+        assert_equals(cache_dir, async_registry.bytecode_cache_dir)
+        new_env = async_registry.environment(self.template_dir)
+        assert_not_equals(env, new_env)
+        assert_true(new_env.auto_reload)
+        assert_true(new_env.is_async)
+        # sync and async bytecode must not be mixed up
+        self.registry.get_template('hello.jinja2', self.template_dir)
+        async_registry.get_template('hello.jinja2', self.template_dir)
+        assert_length(2, os.listdir(cache_dir))
+
+        async_registry.configure(auto_reload=False)
+        assert_false(self.registry.auto_reload)
+        assert_false(async_registry.auto_reload)
+
+    def test_can_render_templates_from_template_path(self):
+        write_template(self.template_dir, 'hello.jinja2', u'Hello {{ value }}!')
+        html = render_jinja_template('hello.jinja2', {'value': 'world'}, self.template_dir)
+        assert_equals(u'Hello world!', html)
@@ -0,0 +1,56 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from io import StringIO
+import os
+import shutil
+import tempfile
+
+from pythonic_testcase import *
+
+from grumpywidgets.api import grumpywidgets_template_dir, Widget
+from grumpywidgets.genshi_support import genshi_loaders
+from grumpywidgets.jinja_support import jinja_environments
+from grumpywidgets.precompile import precompile_templates, warm_up_widget
+from grumpywidgets.template_cache import template_paths
+from grumpywidgets.testhelpers import write_template
+
+
+class PrecompileTest(PythonicTestCase):
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        jinja_environments.invalidate(self.template_dir)
+        genshi_loaders.invalidate(self.template_dir)
+        shutil.rmtree(self.template_dir)
+
+    def test_registers_template_path_for_builtin_widgets(self):
+        assert_contains(grumpywidgets_template_dir, template_paths())
+
+    def test_can_compile_all_templates_in_template_path(self):
+        os.mkdir(os.path.join(self.template_dir, 'sub'))
+        write_template(self.template_dir, 'foo.jinja2', u'{{ value }}')
+        write_template(self.template_dir, 'sub/bar.jinja2', u'{{ value }}')
+        write_template(self.template_dir, 'baz.genshi', u'<p xmlns:py="http://genshi.edgewall.org/">${value}</p>')
+        write_template(self.template_dir, 'ignored.txt', u'')
+
+        compiled = precompile_templates([self.template_dir])
+        names = [(item.template_name, item.template_engine) for item in compiled]
+        assert_equals([('baz.genshi', 'genshi'), ('foo.jinja2', 'jinja2'),
+                       ('sub/bar.jinja2', 'jinja2')], names)
+        for item in compiled:
+            assert_equals(self.template_dir, item.template_path)
+            assert_true(item.duration >= 0)
+
+        env = jinja_environments.environment(self.template_dir)
+        os.remove(os.path.join(self.template_dir, 'foo.jinja2'))
+        # template was compiled already so the file is not needed anymore
+        assert_equals(u'42', env.get_template('foo.jinja2').render(value=42))
+
+    def test_can_warm_up_widget(self):
+        class HelloWidget(Widget):
+            template = StringIO(u'Hello {{ value }}')
+        assert_true(warm_up_widget(HelloWidget) >= 0)
+        assert_true(warm_up_widget(HelloWidget()) >= 0)
@@ -0,0 +1,74 @@
+# This file is a part of GrumpyWidgets.
+# The source code contained in this file is licensed under the MIT license.
+# See LICENSE.txt in the main project directory, for more information.
+
+from io import StringIO
+
+from pythonic_testcase import *
+
+from grumpywidgets.template_cache import FileTemplateCache
+from grumpywidgets.utils import LRUCache
+
+
+class FileTemplateCacheTest(PythonicTestCase):
+    def setUp(self):
+        self.compiled = []
+        self.cache = FileTemplateCache(self._compile, max_size=2)
+
+    def test_compiles_each_template_source_only_once(self):
+        template = self.cache.get_template(StringIO(u'foo'))
+        assert_equals(('compiled', u'foo'), template)
+        assert_equals(template, self.cache.get_template(StringIO(u'foo')))
+        assert_equals([u'foo'], self.compiled)
+
+        self.cache.get_template(StringIO(u'bar'))
+        assert_equals([u'foo', u'bar'], self.compiled)
+
+    def test_rewinds_file_like_object(self):
+        fp = StringIO(u'foo')
+        self.cache.get_template(fp)
+        assert_equals(u'foo', fp.read())
+
+    def test_discards_least_recently_used_templates(self):
+        self.cache.get_template(StringIO(u'foo'))
+        self.cache.get_template(StringIO(u'bar'))
+        self.cache.get_template(StringIO(u'foo'))
+        self.cache.get_template(StringIO(u'baz'))
+        assert_length(2, self.cache)
+
+        self.cache.get_template(StringIO(u'foo'))
+        self.cache.get_template(StringIO(u'bar'))
+        assert_equals([u'foo', u'bar', u'baz', u'bar'], self.compiled)
+
+    def test_can_skip_reading_known_file_like_objects(self):
+        cache = FileTemplateCache(self._compile, use_identity=True)
+        fp = StringIO(u'foo')
+        template = cache.get_template(fp)
+        fp.read()
+        assert_equals(template, cache.get_template(fp))
+        assert_equals([u'foo'], self.compiled)
+
+    def test_can_clear_cache(self):
+        self.cache.get_template(StringIO(u'foo'))
+        self.cache.clear()
+        assert_length(0, self.cache)
+
+    # --- helpers -------------------------------------------------------------
+
+    def _compile(self, source):
+        self.compiled.append(source)
+        return ('compiled', source)
+
+
+class LRUCacheTest(PythonicTestCase):
+    def test_discards_least_recently_used_items(self):
+        cache = LRUCache(max_size=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        assert_equals(1, cache.get('a'))
+        cache['c'] = 3
+
+        assert_length(2, cache)
+        assert_contains('a', cache)
+        assert_not_contains('b', cache)
+        assert_none(cache.get('b'))
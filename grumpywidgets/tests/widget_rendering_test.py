@@ -25,6 +25,27 @@ class WidgetRenderingTest(PythonicTestCase):
         widget = Widget(template=StringIO(tmpl_str), template_engine='genshi')
         assert_same_html(u'<p>Hello world!</p>', widget.display('world'))
 
+    def test_can_stream_jinja_template(self):
+        widget = Widget(template=StringIO(u'Hello {{ value }}!'))
+        assert_equals(u'Hello world!', u''.join(widget.display_stream('world')))
+
+    def test_can_stream_genshi_template(self):
+        tmpl_str = u'<p xmlns:py="http://genshi.edgewall.org/">Hello ${value}!</p>'
+        widget = Widget(template=StringIO(tmpl_str), template_engine='genshi')
+        html = u''.join(widget.display_stream('world'))
+        assert_equals(six.text_type(widget.display('world')), html)
+
+    def test_can_render_into_writer(self):
+        widget = Widget(template=StringIO(u'Hello {{ value }}!'))
+        buffer_ = StringIO()
+        buffer_.write(u'>')
+        widget.render_into(buffer_, 'world')
+        assert_equals(u'>Hello world!', buffer_.getvalue())
+
+        chunks = []
+        widget.render_into(chunks.append, value='you')
+        assert_equals(u'Hello you!', u''.join(chunks))
+
     def test_can_use_value_from_context(self):
         self.widget.context.value = 'baz'
         assert_equals('baz', self.widget.display())
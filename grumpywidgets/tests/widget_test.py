@@ -2,10 +2,16 @@
 # The source code contained in this file is licensed under the MIT license.
 # See LICENSE.txt in the main project directory, for more information.
 
+import abc
+import copy
+import gc
+
 from pycerberus.lib.form_data import FieldData
 from pythonic_testcase import *
+import six
 
-from grumpywidgets.api import Widget
+from grumpywidgets.api import (class_attribute_names,
+    invalidate_class_attribute_names, Widget)
 
 
 class WidgetTest(PythonicTestCase):
@@ -78,4 +84,79 @@ class WidgetTest(PythonicTestCase):
         widget = Widget(container_attrs=dict(foo='bar'))
         assert_equals(dict(foo='bar'), widget.attributes_for_container())
 
-
+    def test_can_return_widget_attributes(self):
+        widget = Widget(id='foo')
+        widget.bar = 42
+        widget.baz = lambda: None
+        attributes = widget.widget_attributes()
+        assert_equals('foo', attributes['id'])
+        assert_equals(42, attributes['bar'])
+        assert_not_contains('baz', attributes)
+        assert_not_contains('display', attributes)
+        assert_not_contains('_template', attributes)
+
+    def test_caches_attribute_names_per_class(self):
+        class FooWidget(Widget):
+            foo = None
+        attribute_names, method_names = class_attribute_names(FooWidget)
+        assert_contains('foo', attribute_names)
+        assert_contains('display', method_names)
+        assert_not_contains('display', attribute_names)
+        assert_true(attribute_names is class_attribute_names(FooWidget)[0])
+
+    def test_can_invalidate_attribute_names_when_class_is_modified(self):
+        class FooWidget(Widget):
+            foo = None
+        assert_not_contains('bar', FooWidget().widget_attributes())
+
+        FooWidget.bar = 21
+        invalidate_class_attribute_names()
+        assert_equals(21, FooWidget().widget_attributes()['bar'])
+        assert_equals(42, FooWidget(bar=42).bar)
+
+        del FooWidget.foo
+        invalidate_class_attribute_names()
+        assert_not_contains('foo', FooWidget().widget_attributes())
+        assert_raises(TypeError, lambda: FooWidget(foo=1))
+
+    def test_can_use_widgets_with_custom_metaclass(self):
+        class AbstractWidget(six.with_metaclass(abc.ABCMeta, Widget)):
+            @abc.abstractmethod
+            def greeting(self):
+                pass
+        class HelloWidget(AbstractWidget):
+            def greeting(self):
+                return u'hello'
+        assert_raises(TypeError, lambda: AbstractWidget())
+        assert_equals(u'hello', HelloWidget().greeting())
+
+    def test_can_bind_widget_with_new_context_and_overrides(self):
+        widget = Widget(id='foo', css_classes=('a', ))
+        context = FieldData(initial_value='42')
+        bound = widget.bind(context, id='bar')
+        assert_equals('bar', bound.id)
+        assert_equals('foo', widget.id)
+        assert_true(bound.css_classes is widget.css_classes)
+        assert_true(bound.context is context)
+        assert_false(widget.bind().context is widget.context)
+
+    def test_stores_only_weak_reference_to_parent(self):
+        parent = Widget()
+        child = Widget()
+        child.parent = parent
+        assert_true(child.parent is parent)
+        assert_not_contains('parent', child.__dict__)
+
+        del parent
+        gc.collect()
+        assert_none(child.parent)
+
+    def test_deepcopy_keeps_parent_references(self):
+        parent = Widget()
+        parent.children = (Widget(), )
+        parent.children[0].parent = parent
+
+        copied_parent = copy.deepcopy(parent)
+        copied_child = copied_parent.children[0]
+        assert_false(copied_child is parent.children[0])
+        assert_true(copied_child.parent is copied_parent)
@@ -3,10 +3,12 @@
 # The source code contained in this file is licensed under the MIT license.
 # See LICENSE.txt in the main project directory, for more information.
 
+from collections import OrderedDict
 from contextlib import contextmanager
+import threading
 
 
-__all__ = ['provide_as_dict_item']
+__all__ = ['overrides_display_only', 'provide_as_dict_item', 'LRUCache']
 
 @contextmanager
 def provide_as_dict_item(dictcontainer, key, value):
@@ -18,3 +20,58 @@ def provide_as_dict_item(dictcontainer, key, value):
         dictcontainer[key] = value
         yield
         del dictcontainer[key]
+
+
+# widget class -> True if only ".display()" is overridden
+_display_overrides = {}
+
+def overrides_display_only(klass):
+    """Return True if the widget class overrides "display()" but not
+    "display_stream()" (e.g. widgets written before streaming was added).
+    Containers must render such children via ".display()"."""
+    result = _display_overrides.get(klass)
+    if result is None:
+        mro = klass.__mro__
+        def defined_in(name):
+            for index, class_ in enumerate(mro):
+                if name in class_.__dict__:
+                    return index
+            return len(mro)
+        result = defined_in('display') < defined_in('display_stream')
+        _display_overrides[klass] = result
+    return result
+
+
+class LRUCache(object):
+    """Thread-safe mapping which discards the least recently used items once
+    more than "max_size" items are stored."""
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                return default
+            self._items[key] = value
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()